@@ -3,63 +3,359 @@ import streamlit as st
 import pandas as pd
 from dbConfig import get_db_connection
 import io
-from st_aggrid import AgGrid, GridOptionsBuilder, JsCode
-from st_aggrid import GridUpdateMode
-from modules.lim1DataManager import uploadLim1
+import math
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from modules.lim1DataManager import streamUploadTable, uploadTable
+from modules.uploadDestinations import DESTINATIONS, apply_fallback
+from modules.fileIngest import UPLOAD_TYPES, read_and_merge as read_uploaded
+from modules.uploadValidation import QUARTERS, validate
+from modules.ingestLedger import duplicate_mask, file_hash, record_files, split_new_files
+from modules.bulkInsert import DEFAULT_CHUNK_SIZE, DEFAULT_WORKERS
+from modules.streamIngest import StreamIngest
+from modules.tableCache import table_cache
+from modules.writeBehind import submit_write
+from modules.calculatedWriter import commit_quarter_scores
+from modules.quarterScores import SCORE_COLUMNS, quarter_score_rows
+from modules.tableSync import get_snapshot, sync_table
+from modules import diskCache
+from modules.dtypePlan import apply_dtype_plan
 
 supabase = get_db_connection()
-def load_all_data(table_name, batch_size=1000):
-        all_data = []
-        last_id = None
-        total_fetched = 0
+
+def _select_clause(columns):
+    """Kolom yang diminta ke PostgREST; id selalu ikut karena dipakai untuk keyset."""
+    if not columns:
+        return "*"
+    return ",".join(["id"] + [c for c in columns if c != "id"])
+
+def _query_key(columns, filters, compact=True):
+    """Kunci cache yang unik untuk kombinasi kolom + filter (+ dtype ringkas atau tidak)."""
+    cols = tuple(columns) if columns else ()
+    flt = tuple(sorted(
+        (col, tuple(sorted(val)) if isinstance(val, (list, tuple, set)) else val)
+        for col, val in (filters or {}).items()
+    ))
+    return (cols, flt) if compact else (cols, flt, "raw")
+
+def _compact(table_name, df):
+    """Terapkan rencana dtype tabel (modules/dtypePlan.py) dan laporkan penghematan memori."""
+    df, before, after = apply_dtype_plan(table_name, df)
+    if after < before:
+        st.caption(f"🗜️ Memori '{table_name}': {before / 1e6:.1f} MB → {after / 1e6:.1f} MB")
+    return df
+
+def _base_query(table_name, columns=None, filters=None, count=None):
+    """
+    Query select dengan proyeksi kolom dan filter yang dikirim ke PostgREST.
+    filters: {kolom: nilai} → eq, atau {kolom: [nilai, ...]} → in.
+    """
+    query = supabase.table(table_name).select(_select_clause(columns), count=count)
+    for col, val in (filters or {}).items():
+        if isinstance(val, (list, tuple, set)):
+            query = query.in_(col, list(val))
+        else:
+            query = query.eq(col, val)
+    return query
+
+def _fetch_id_range(table_name, id_from, id_to, batch_size, columns=None, filters=None):
+    """Ambil semua baris dengan id_from <= id < id_to (keyset di dalam range)."""
+    rows = []
+    last_id = None
+    while True:
+        query = (
+            _base_query(table_name, columns, filters)
+            .gte("id", id_from).lt("id", id_to)
+            .order("id", desc=False).limit(batch_size)
+        )
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        data = query.execute().data
+        if not data:
+            break
+        rows.extend(data)
+        last_id = data[-1]["id"]
+        if len(data) < batch_size:
+            break
+    return rows
+
+def _update_row(table_name, row_id, values):
+    supabase.table(table_name).update(values).eq("id", row_id).execute()
+
+def _delete_row(table_name, row_id):
+    supabase.table(table_name).delete().eq("id", row_id).execute()
+
+# Dipanggil lewat on_commit (modules/writeBehind.py): DataFrame di sesi hanya berubah
+# setelah penulisan benar-benar tersimpan, dan hanya jika tabel yang dimuat masih sama
+def _apply_local_update(table_name, row_id, values):
+    df = st.session_state.get("df")
+    if df is not None and st.session_state.get("df_table") == table_name:
+        df.loc[df["id"] == row_id, list(values.keys())] = list(values.values())
+
+def _apply_local_delete(table_name, row_id):
+    df = st.session_state.get("df")
+    if df is not None and st.session_state.get("df_table") == table_name:
+        st.session_state.df = df[df["id"] != row_id]
+
+def _existing_rows(table_name, columns):
+    """
+    Loader baris yang sudah ada di tabel untuk dedupe upload streaming.
+    Tanpa elemen Streamlit, jadi aman dipanggil dari thread pipeline.
+    """
+    def load(filters):
+        rows = _fetch_id_range(table_name, 0, 2**62, 1000, columns, filters)
+        return pd.DataFrame(rows, columns=["id"] + [c for c in columns if c != "id"])
+    return load
+
+def _iter_parallel(table_name, batch_size, max_workers, progress, progress_text, columns=None, filters=None):
+    """
+    Ambil batas id dan jumlah baris pasti sekali, bagi ruang id menjadi
+    beberapa range, lalu ambil tiap range di thread pool terbatas.
+    Range di-yield sesuai urutan (urutan id tetap naik) begitu tersedia.
+    """
+    first = _base_query(table_name, ["id"], filters, count="exact").order("id", desc=False).limit(1).execute()
+    if not first.data:
+        return
+    last = _base_query(table_name, ["id"], filters).order("id", desc=True).limit(1).execute()
+    min_id, max_id = first.data[0]["id"], last.data[0]["id"]
+    total_rows = first.count or 0
+
+    n_ranges = max(1, math.ceil(total_rows / batch_size))
+    width = max(1, math.ceil((max_id - min_id + 1) / n_ranges))
+    ranges = [(lo, min(lo + width, max_id + 1)) for lo in range(min_id, max_id + 1, width)]
+
+    done = {}
+    next_index = 0
+    total_fetched = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(_fetch_id_range, table_name, lo, hi, batch_size, columns, filters): i
+            for i, (lo, hi) in enumerate(ranges)
+        }
+        # Progress diperbarui dari thread utama (elemen Streamlit tidak thread-safe)
+        for future in as_completed(futures):
+            done[futures[future]] = future.result()
+            total_fetched += len(done[futures[future]])
+            progress.progress(min(1.0, total_fetched / max(total_rows, 1)))
+            progress_text.text(f"📦 Mengambil data... {total_fetched}/{total_rows} baris diambil.")
+            while next_index in done:
+                rows = done.pop(next_index)
+                next_index += 1
+                if rows:
+                    yield rows
+
+def _iter_keyset(table_name, batch_size, progress, progress_text, columns=None, filters=None):
+    """Ambil tabel satu batch keyset demi satu batch (urut id naik)."""
+    last_id = None
+    total_fetched = 0
+    while True:
+        # Query batch dengan urutan id naik
+        query = _base_query(table_name, columns, filters).order("id", desc=False).limit(batch_size)
+
+        # Ambil data setelah id terakhir di batch sebelumnya
+        if last_id is not None:
+            query = query.gt("id", last_id)
+
+        data = query.execute().data
+        if not data:
+            break  # Sudah tidak ada data
+
+        total_fetched += len(data)
+        last_id = data[-1]["id"]  # Simpan ID terakhir dari batch
+
+        # Karena kita tidak tahu total pasti, kita buat animasi incremental 0–90%
+        progress.progress(min(0.9, total_fetched / (total_fetched + batch_size)))
+        progress_text.text(f"📦 Mengambil data... Total {total_fetched} baris diambil.")
+        yield data
+
+        # Jika jumlah data < batch_size → artinya sudah selesai
+        if len(data) < batch_size:
+            break
+
+def _empty_frame(columns=None):
+    """
+    DataFrame kosong yang tetap punya kolom yang diminta: quarter tanpa baris
+    tidak boleh membuat halaman yang langsung mengakses kolomnya gagal (KeyError).
+    """
+    return pd.DataFrame(columns=_select_clause(columns).split(",") if columns else [])
+
+def _apply_local(df, columns=None, filters=None):
+    """Proyeksi kolom dan filter yang sama seperti _base_query, tetapi pada DataFrame lokal."""
+    if df.empty and columns:
+        return _empty_frame(columns)
+    for col, val in (filters or {}).items():
+        if isinstance(val, (list, tuple, set)):
+            df = df[df[col].isin(list(val))]
+        else:
+            df = df[df[col] == val]
+    if columns:
+        df = df[[c for c in _select_clause(columns).split(",") if c in df.columns]]
+    return df.reset_index(drop=True)
+
+def _concat_chunks(chunks, columns=None):
+    if not chunks:
+        return _empty_frame(columns)
+    df = pd.concat(chunks, ignore_index=True)
+    # Urutkan untuk memastikan konsistensi
+    if "id" in df.columns:
+        df = df.sort_values("id").reset_index(drop=True)
+    return df
+
+def _stream_incremental(table_name, batch_size, max_workers, columns=None, filters=None, compact=True):
+    """Muat dari snapshot lokal yang disinkronkan delta (lihat modules/tableSync.py)."""
+    if get_snapshot(table_name) is not None:
+        # Snapshot bisa dibuang (on_table_write) setelah dicek di atas → sync_table
+        # butuh loader penuh sungguhan (keyset, tanpa elemen Streamlit)
+        df, summary = sync_table(
+            supabase, table_name, lambda: _fetch_id_range(table_name, 0, 2**62, batch_size), batch_size=batch_size
+        )
+        if summary["full"]:
+            st.caption(f"🔄 '{table_name}' dimuat ulang penuh ({summary['rows']} baris).")
+        else:
+            st.caption(
+                f"🔄 Sinkronisasi '{table_name}': {summary['new']} baru, "
+                f"{summary['changed']} berubah, {summary['deleted']} dihapus ({summary['rows']} baris)."
+            )
+        df = _apply_local(df, columns, filters)
+        if compact:
+            df = _compact(table_name, df)
+        yield df
+        return df
+
+    # Muat penuh pertama kali; chunk tetap di-yield agar halaman bisa menampilkan preview
+    st.info(f"⏳ Mengambil seluruh data dari tabel '{table_name}'...")
+    progress = st.progress(0)
+    progress_text = st.empty()
+    chunks = []
+    for rows in _iter_parallel(table_name, batch_size, max_workers, progress, progress_text):
+        chunk = pd.DataFrame(rows)
+        chunks.append(chunk)
+        yield _apply_local(chunk, columns, filters)
+    progress.progress(1.0)
+    progress_text.text("✅ Pengambilan data selesai!")
+    full_df = _concat_chunks(chunks)
+    del chunks
+
+    df, summary = sync_table(supabase, table_name, lambda: full_df, batch_size=batch_size)
+    st.success(f"✅ Berhasil memuat {summary['rows']} data unik dari '{table_name}'.")
+    df = _apply_local(df, columns, filters)
+    return _compact(table_name, df) if compact else df
+
+def stream_all_data(
+        table_name,
+        batch_size=1000,
+        use_cache=True,
+        parallel=False,
+        max_workers=4,
+        columns=None,
+        filters=None,
+        incremental=False,
+        compact=True,
+    ):
+        """
+        Generator: yield DataFrame per batch keyset begitu batch tiba, sehingga
+        halaman bisa menampilkan preview / agregat sementara selama loading.
+        Parameter sama dengan load_all_data. Nilai return generator adalah
+        DataFrame lengkap (dipakai load_all_data); jika data diambil dari cache,
+        seluruh DataFrame di-yield sebagai satu chunk.
+        """
+        query_key = _query_key(columns, filters, compact)
+
+        # Rerun Streamlit cukup mengambil dari cache proses (jika belum kadaluarsa)
+        if use_cache:
+            cached = table_cache.get(table_name, query_key)
+            if cached is None:
+                # Salinan Arrow di disk (mis. setelah restart server / dari worker lain)
+                on_disk = diskCache.get(table_name, query_key)
+                if on_disk is not None:
+                    cached = on_disk[0]
+                    table_cache.put(table_name, query_key, cached)
+            if cached is not None:
+                yield cached
+                return cached
+
+        if incremental:
+            df = yield from _stream_incremental(table_name, batch_size, max_workers, columns, filters, compact)
+            if use_cache:
+                table_cache.put(table_name, query_key, df)
+            return df
 
         st.info(f"⏳ Mengambil seluruh data dari tabel '{table_name}'...")
         progress = st.progress(0)
         progress_text = st.empty()
 
-        while True:
-            # Query batch dengan urutan id naik
-            query = supabase.table(table_name).select("*").order("id", desc=False).limit(batch_size)
-            
-            # Ambil data setelah id terakhir di batch sebelumnya
-            if last_id is not None:
-                query = query.gt("id", last_id)
-            
-            response = query.execute()
-            data = response.data
-
-            if not data:
-                break  # Sudah tidak ada data
-
-            all_data.extend(data)
-            total_fetched += len(data)
-            last_id = data[-1]["id"]  # Simpan ID terakhir dari batch
-
-            # Update progress bar
-            # Karena kita tidak tahu total pasti, kita buat animasi incremental 0–90%
-            progress.progress(min(0.9, total_fetched / (total_fetched + batch_size)))
-            progress_text.text(f"📦 Mengambil data... Total {total_fetched} baris diambil.")
+        if parallel:
+            batches = _iter_parallel(table_name, batch_size, max_workers, progress, progress_text, columns, filters)
+        else:
+            batches = _iter_keyset(table_name, batch_size, progress, progress_text, columns, filters)
 
-            # Jika jumlah data < batch_size → artinya sudah selesai
-            if len(data) < batch_size:
-                break
+        # Tiap batch langsung jadi DataFrame; list of dict batch sebelumnya sudah dilepas
+        chunks = []
+        for rows in batches:
+            chunk = pd.DataFrame(rows)
+            del rows
+            chunks.append(chunk)
+            yield chunk
 
         # Tutup progress bar
         progress.progress(1.0)
         progress_text.text("✅ Pengambilan data selesai!")
 
-        # Konversi ke DataFrame
-        df = pd.DataFrame(all_data)
-
-        # Urutkan untuk memastikan konsistensi
-        if "id" in df.columns:
-            df = df.sort_values("id").reset_index(drop=True)
+        df = _concat_chunks(chunks, columns)
+        del chunks
 
         st.success(f"✅ Berhasil memuat {len(df)} data unik dari '{table_name}'.")
+        if compact:
+            df = _compact(table_name, df)
+        if use_cache:
+            table_cache.put(table_name, query_key, df)
+            diskCache.put(table_name, query_key, df)
         return df
 
+def load_all_data(
+        table_name,
+        batch_size=1000,
+        use_cache=True,
+        parallel=False,
+        max_workers=4,
+        columns=None,
+        filters=None,
+        incremental=False,
+        compact=True,
+        on_chunk=None,
+    ):
+        """
+        Muat tabel Supabase ke DataFrame.
+        columns: daftar kolom yang diambil (default semua kolom).
+        filters: filter yang dijalankan di server, mis. {"quarter": "Q1"}
+                 atau {"Quarter": ["Q1", "Q2"], "nik": [860066, 910156]}.
+        incremental: pakai snapshot lokal yang hanya mengambil delta sejak
+                     sinkronisasi terakhir; kolom/filter diterapkan secara lokal.
+        compact: terapkan rencana dtype ringkas (category / string Arrow / downcast angka).
+        on_chunk: callback(chunk_df, total_rows) yang dipanggil tiap batch tiba,
+                  untuk render progresif di halaman.
+        """
+        stream = stream_all_data(
+            table_name,
+            batch_size=batch_size,
+            use_cache=use_cache,
+            parallel=parallel,
+            max_workers=max_workers,
+            columns=columns,
+            filters=filters,
+            incremental=incremental,
+            compact=compact,
+        )
+        total_rows = 0
+        while True:
+            try:
+                chunk = next(stream)
+            except StopIteration as stop:
+                return stop.value
+            total_rows += len(chunk)
+            if on_chunk is not None:
+                on_chunk(chunk, total_rows)
+
 def show_data_manager():
-    supabase = get_db_connection()
     def init_aggrid(
         df, 
         grid_key=None, 
@@ -84,7 +380,8 @@ def show_data_manager():
         numeric_cols = df.select_dtypes(include='number').columns
         df[numeric_cols] = df[numeric_cols].round(3)
 
-        # 🧩 Setup Grid
+        # 🧩 Setup Grid (st_aggrid baru diimpor saat grid benar-benar dirender)
+        from st_aggrid import AgGrid, GridOptionsBuilder, GridUpdateMode
         gb = GridOptionsBuilder.from_dataframe(df)
         gb.configure_grid_options(domLayout='normal')
 
@@ -153,117 +450,133 @@ def show_data_manager():
         return grid_response, selected_row, selected_id
     
     st.title("🗃️ Data Manager")
-    supabase = get_db_connection()
-    options = ["Upload Data", "Lihat Data", "Edit Data"]
+    options = ["Upload Data", "Lihat Data", "Edit Data", "Commit Quarter"]
     menu = st.pills("Action", options, selection_mode="single", default="Upload Data")
 
     # --- 🟢 UPLOAD DATA ---
     if menu == "Upload Data":
-        st.subheader("📤 Upload File Excel ke Database")
+        st.subheader("📤 Upload File ke Database")
 
         uploaded_file = st.file_uploader(
-            "Upload data (format Excel)", 
+            "Upload data (Excel, CSV/TSV, atau Parquet)", 
             accept_multiple_files=True, 
-            type=["xls", "xlsx"]
+            type=UPLOAD_TYPES
         )
         
-        def read_and_merge(files, table_name):
-            all_data = []
-            # 1️⃣ Ambil ID terakhir dari database
+        def read_and_merge(files, destination):
+            # 1️⃣ id tidak dibuat di klien: kolom identity di database yang mengisinya
+            #    (sql/002_server_generated_ids.sql), jadi upload paralel tidak bentrok
+            # 2️⃣ Peta kolom dan dtype per destinasi ada di modules/uploadDestinations
+            # 3️⃣ Baca semua file paralel; hanya kolom yang dipetakan yang dibaca
+            #    (mapping kolom, dtype, dan metadata nama file di proses worker)
+            combined = read_uploaded(files, destination["column_mapping"], destination["dtypes"])
+            return apply_fallback(combined, destination) if not combined.empty else combined
+
+        def prepare_upload(files, destination):
+            """
+            Hanya file yang belum pernah masuk (menurut ledger hash) yang dibaca
+            dan divalidasi. Dedupe baru dijalankan saat upload (dedupe_pending),
+            setelah chunk yang sudah ter-commit disaring jurnal.
+            """
+            table_name = destination["table"]
+            rejected = pd.DataFrame()
+            fresh, skipped = split_new_files(files, table_name)
+            for f, _ in skipped:
+                st.info(f"⏭️ {f.name} sudah pernah diupload ke '{table_name}', dilewati tanpa dibaca.")
+            entries = [(f.name, digest) for f, digest in fresh]
+            if not fresh:
+                return pd.DataFrame(), entries, rejected
+
+            combined = read_and_merge([f for f, _ in fresh], destination)
+            if combined.empty:
+                return combined, entries, rejected
+
+            # Validasi seluruh batch sekaligus; hanya baris bersih yang lanjut ke upload
+            combined, rejected = validate(combined, table_name)
+            return combined, entries, rejected
+
+        def dedupe_pending(destination):
+            """
+            Dedupe untuk uploadTable: baris duplikat di dalam batch atau yang sudah ada
+            di tabel tidak dikirim. Dijalankan pada baris yang belum ter-commit saja,
+            jadi upload yang dilanjutkan tetap memakai jurnal yang sama.
+            """
+            key = destination["row_key"]
+
+            def dedupe(df):
+                # Baris yang sudah ada: query dipersempit ke nilai kolom filter yang ada di batch
+                existing = load_all_data(
+                    destination["table"],
+                    use_cache=False,
+                    columns=key,
+                    filters={col: sorted(df[col].dropna().unique()) for col in destination["dedupe_filters"]},
+                    compact=False,
+                )
+                keep, dup_batch, dup_db = duplicate_mask(df, existing, key)
+                if dup_batch or dup_db:
+                    st.info(f"🧹 {dup_batch} baris duplikat dalam batch dan {dup_db} baris yang sudah ada di database dibuang.")
+                return keep
+            return dedupe
+
+        tableName = st.radio("Pilih destinasi:", list(DESTINATIONS))
+        destination = DESTINATIONS[tableName]
+        DestinationTable = destination["table"]
+        # Mode streaming: file dibaca, divalidasi, dan diinsert per potongan saat upload
+        # (tanpa pratinjau), sehingga memori tetap datar untuk file yang sangat besar
+        streaming = st.checkbox("Mode streaming (file sangat besar)", key="upload_streaming")
+        # Simpan hasil upload ke session_state agar tidak hilang setelah interaksi;
+        # file yang sama tidak dibaca ulang di setiap rerun. Kunci "dm_upload" khusus
+        # Data Manager (halaman lain memakai "combined_df" untuk upload mereka sendiri)
+        upload = {}
+        if uploaded_file and not streaming:
+            upload_key = (DestinationTable, tuple(file_hash(f) for f in uploaded_file))
+            upload = st.session_state.get("dm_upload", {})
+            if upload.get("key") != upload_key:
+                combined_df, entries, rejected = prepare_upload(uploaded_file, destination)
+                upload = {"key": upload_key, "df": combined_df, "entries": entries, "rejected": rejected}
+                st.session_state["dm_upload"] = upload
+        combined_df = upload.get("df", pd.DataFrame())
+        rejected = upload.get("rejected", pd.DataFrame())
+        if not streaming:
+            if not rejected.empty:
+                st.warning(f"⚠️ {len(rejected)} baris ditolak validasi dan tidak akan diupload.")
+                st.dataframe(rejected)
+                st.download_button(
+                    "📥 Unduh laporan baris ditolak",
+                    rejected.to_csv(index=False).encode("utf-8"),
+                    file_name=f"rejected_{DestinationTable}.csv",
+                    mime="text/csv",
+                )
+            st.dataframe(combined_df)
+        chunk_size = st.number_input(
+            "Baris per request (chunk)", min_value=500, max_value=5000,
+            value=DEFAULT_CHUNK_SIZE, step=500, key="upload_chunk_size"
+        )
+        workers = st.slider("Jumlah worker upload", min_value=1, max_value=16, value=DEFAULT_WORKERS, key="upload_workers")
+        if uploaded_file and streaming and st.button("Upload ke Database", key=f"stream_{DestinationTable}"):
+            fresh, skipped = split_new_files(uploaded_file, DestinationTable)
+            for f, _ in skipped:
+                st.info(f"⏭️ {f.name} sudah pernah diupload ke '{DestinationTable}', dilewati tanpa dibaca.")
+            if fresh:
+                stream = StreamIngest(
+                    [(f.name, f, digest) for f, digest in fresh],
+                    destination,
+                    int(chunk_size),
+                    _existing_rows(DestinationTable, destination["row_key"]),
+                )
+                complete = streamUploadTable(stream, workers=workers)
+                if complete:
+                    record_files(DestinationTable, complete)
+        elif uploaded_file and not streaming and st.button("Upload ke Database", key=f"upload_{DestinationTable}"):
             try:
-                response = supabase.table(table_name).select("id").order("id", desc=True).limit(1).execute()
-                if response.data:
-                    last_id = response.data[0]["id"]
-                else:
-                    last_id = 0
+                complete = uploadTable(
+                    combined_df, DestinationTable, destination["columns"],
+                    chunk_size=int(chunk_size), workers=workers, dedupe=dedupe_pending(destination),
+                )
+                if complete:
+                    record_files(DestinationTable, upload.get("entries", []))
             except Exception as e:
-                st.warning(f"Gagal mengambil ID terakhir dari database: {e}")
-                last_id = 0
-
-            id_counter = last_id + 1  # mulai dari id terakhir + 1
-            
-            # 2️⃣ Peta kolom alternatif ke nama sesuai DB Supabase
-            if table_name == "learningImpact1":
-                column_mapping = {
-                    "id": "id",
-                    "email": "Email",
-                    "email address": "Email",
-                    "Email": "Email",
-                    "question": "Question",
-                    "cleaned_question": "Question",
-                    "soal": "Question",
-                    "answer": "Answer",
-                    "cleaned_answer": "Answer",
-                    "response": "Answer",
-                }
-                # 3️⃣ Kolom target sesuai tabel Supabase
-                required_columns = ["id", "Email", "Event", "Question", "Answer", "Expert", "Unit", "Quarter"]
-            elif table_name == "learningHours":
-                column_mapping = {
-                    "id":"id"
-                }
-            elif table_name == "event":
-                column_mapping = {
-                    "id":"id"
-                }
-            for uploaded_file in files:
-                try:
-                    df = pd.read_excel(uploaded_file)
-                except Exception as e:
-                    st.error(f"Gagal membaca file {uploaded_file.name}: {e}")
-                    continue
-                # Normalisasi nama kolom → lowercase dan strip spasi
-                df.columns = [col.strip().lower() for col in df.columns]
-
-                # Mapping nama kolom agar cocok dengan struktur Supabase
-                df.rename(columns=lambda c: column_mapping.get(c.lower(), c), inplace=True)
-
-                # Ambil nama file tanpa ekstensi
-                file_name = uploaded_file.name.rsplit(".", 1)[0]
-                parts = file_name.split("_")
-                event, expert, unit, quarter = (parts + ["", "", "", ""])[:4]
-                
-                # Isi kolom yang hilang agar tetap sesuai struktur tabel
-                for col in required_columns:
-                    if col not in df.columns:
-                        df[col] = ""
-
-                # Tambahkan kolom metadata
-                df["Event"] = event
-                df["Expert"] = expert
-                df["Unit"] = unit
-                df["Quarter"] = quarter
-                df["id"] = range(id_counter, id_counter + len(df))
-                id_counter += len(df)
-                all_data.append(df)
-
-            if all_data:
-                combined = pd.concat(all_data, ignore_index=True)
-                combined["Event"] = combined["Event"].fillna("").astype(str).str.strip()
-                combined = combined.fillna("empty").replace("", "empty")
-                return combined
-            else:
-                return pd.DataFrame()
-
-        tableName = st.radio("Pilih destinasi:", ["Learning Impact 1", "Learning Hours", "Variation"])
-        if tableName == "Learning Impact 1":
-            DestinationTable = "learningImpact1"
-             # Simpan hasil upload ke session_state agar tidak hilang setelah interaksi
-            if uploaded_file:
-                st.session_state["combined_df"] = read_and_merge(uploaded_file, DestinationTable)
-            # Ambil data dari session_state
-            combined_df = st.session_state.get("combined_df", pd.DataFrame())
-            st.dataframe(combined_df)
-            if uploaded_file and st.button("Upload ke Database", key="upload_Lim1"):
-                try:
-                    upload = True
-                    uploadLim1(combined_df, DestinationTable, supabase, upload)
-                except Exception as e:
-                    st.error(f"❌ Gagal upload: {e}")
-        elif tableName == "Learning Hours":
-            viewTable = "none"
-        elif tableName == "Variation":
-            DestinationTable = "none"
+                st.error(f"❌ Gagal upload: {e}")
 
     # --- 🔵 READ DATA ---
     elif menu == "Lihat Data":
@@ -279,7 +592,6 @@ def show_data_manager():
 
         if st.button("Tampilkan Data"):
             try:
-                response = supabase.table(viewTable).select("*").execute()
                 df = load_all_data(viewTable)
 
                 if df.empty:
@@ -316,12 +628,14 @@ def show_data_manager():
         # -----------------------------
         if st.button("📥 Muat Data"):
             try:
-                df = load_all_data(table_name)
+                # Tanpa dtype ringkas: kolom kategori tidak bisa diisi nilai baru saat diedit
+                df = load_all_data(table_name, compact=False)
 
                 if df.empty:
                     st.warning("Tidak ada data di tabel ini.")
                 else:
                     st.session_state.df = df
+                    st.session_state.df_table = table_name
                     st.success(f"✅ Data berhasil dimuat ({len(df)} baris)")
             except Exception as e:
                 st.error(f"Gagal memuat data: {e}")
@@ -392,21 +706,56 @@ def show_data_manager():
                 # -----------------------------
                 # UPDATE DATA
                 # -----------------------------
+                # Penulisan berjalan di latar (modules/writeBehind.py); edit berulang pada
+                # baris yang sama sebelum tersimpan digabung menjadi satu request
                 if st.button("💾 Simpan Perubahan"):
-                    try:
-                        response = supabase.table(table_name).update(updated_data).eq("id", selected_id).execute()
-                        st.success("✅ Data berhasil diperbarui!")
-                        st.session_state.df.loc[df["id"] == selected_id, list(updated_data.keys())] = list(updated_data.values())
-                    except Exception as e:
-                        st.error(f"🚨 Gagal memperbarui data: {e}")
+                    submit_write(
+                        table_name, selected_id,
+                        lambda: _update_row(table_name, selected_id, updated_data),
+                        label=f"Ubah {table_name} #{selected_id}",
+                        on_commit=lambda: _apply_local_update(table_name, selected_id, updated_data),
+                    )
+                    st.info("⏳ Perubahan disimpan di latar; status tampil di sidebar.")
 
                 # -----------------------------
                 # DELETE DATA
                 # -----------------------------
+                # Hapus memakai kunci yang sama: perubahan yang belum tersimpan ikut digantikan
                 if st.button("🗑️ Hapus Data Ini"):
-                    try:
-                        response = supabase.table(table_name).delete().eq("id", selected_id).execute()
-                        st.success("🗑️ Data berhasil dihapus!")
-                        st.session_state.df = df[df["id"] != selected_id]
-                    except Exception as e:
-                        st.error(f"🚨 Gagal menghapus data: {e}")
\ No newline at end of file
+                    submit_write(
+                        table_name, selected_id,
+                        lambda: _delete_row(table_name, selected_id),
+                        label=f"Hapus {table_name} #{selected_id}",
+                        on_commit=lambda: _apply_local_delete(table_name, selected_id),
+                    )
+                    st.info("⏳ Penghapusan berjalan di latar; status tampil di sidebar.")
+
+    # --- 🟣 COMMIT QUARTER ---
+    elif menu == "Commit Quarter":
+        st.subheader("🧮 Commit Skor Quarter")
+        st.caption(
+            "Hitung Learning Hour, Variation, dan Expert Level dari data learningHour_new, "
+            "lalu tulis semuanya ke tabel 'calculated' dalam satu transaksi."
+        )
+        quarter = st.pills("Pilih Quarter", QUARTERS, selection_mode="single", default="Q1", key="commit_quarter")
+        source = load_all_data(
+            "learningHour_new",
+            columns=["nik", "expert", "company", "event", "variasi", "learningHour", "profLevel", "quarter"],
+            filters={"quarter": quarter},
+        )
+        if source.empty:
+            st.info("Tidak terdapat data")
+        else:
+            rows = quarter_score_rows(source, load_all_data("expert_level"))
+            cols = st.columns(len(SCORE_COLUMNS) + 1)
+            cols[0].metric("Expert", len(rows), border=True)
+            for col, name in zip(cols[1:], SCORE_COLUMNS):
+                col.metric(f"Tanpa {name}", int(rows[name].isna().sum()), border=True)
+            st.dataframe(rows, use_container_width=True)
+            st.warning(f"⚠️ Baris {quarter} di tabel 'calculated' yang tidak ada di daftar ini akan dihapus.")
+            if st.button("💾 Commit Quarter", key=f"commit_{quarter}"):
+                submit_write(
+                    "calculated", ("quarter", quarter), lambda: commit_quarter_scores(rows, quarter),
+                    label=f"Commit {quarter}",
+                )
+                st.info(f"⏳ Commit {quarter} berjalan di latar; status tampil di sidebar.")
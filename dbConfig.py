@@ -1,17 +1,34 @@
-from supabase import create_client
+from supabase import create_client, ClientOptions
+import httpx
 import streamlit as st
+from modules.asyncPostgrest import AsyncPostgrestClient, DEFAULT_CONCURRENCY
+from modules.connectionStats import trace_request
 
 SUPABASE_URL = st.secrets["SUPABASE_URL"]
 SUPABASE_KEY = st.secrets["SUPABASE_KEY"]
 
+@st.cache_resource
 def get_db_connection():
+    """
+    Satu klien Supabase per proses, dipakai bersama oleh semua sesi dan halaman.
+    Klien httpx di bawahnya thread-safe dan menyimpan koneksi keep-alive,
+    sehingga rerun tidak membuka koneksi TCP/TLS baru.
+    """
     url = st.secrets["SUPABASE_URL"]
     key = st.secrets["SUPABASE_KEY"]
-    return create_client(url, key)
+    http_client = httpx.Client(
+        http2=True,
+        timeout=120,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=20, max_keepalive_connections=20, keepalive_expiry=300),
+        event_hooks={"request": [trace_request]},
+    )
+    return create_client(url, key, options=ClientOptions(httpx_client=http_client))
 
-def init_connection():
-    """Inisialisasi koneksi ke Supabase"""
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
+def get_async_db_client(max_concurrency=DEFAULT_CONCURRENCY):
+    """Klien PostgREST async (HTTP/2) untuk operasi batch yang berjalan bersamaan"""
+    return AsyncPostgrestClient(SUPABASE_URL, SUPABASE_KEY, max_concurrency=max_concurrency)
 
-# Buat instance global agar tidak reconnect terus
-supabase = init_connection()
\ No newline at end of file
+def init_connection():
+    """Inisialisasi koneksi ke Supabase (klien bersama per proses)"""
+    return get_db_connection()
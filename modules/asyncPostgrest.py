@@ -0,0 +1,130 @@
+import asyncio
+import threading
+
+import httpx
+
+from modules.connectionStats import atrace_request
+
+DEFAULT_CONCURRENCY = 8
+
+
+def _format_in_value(value):
+    """Satu nilai di dalam in.(...); teks dengan karakter khusus list dibungkus tanda kutip."""
+    text = str(value)
+    if any(ch in text for ch in ',.:()" \\'):
+        text = '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+    return text
+
+
+def _filter_params(filters):
+    """
+    {kolom: nilai} → eq, {kolom: [nilai, ...]} → in (sama seperti load_all_data).
+    Nilai eq dikirim apa adanya (PostgREST tidak membuka tanda kutip di eq);
+    tanda kutip hanya dipakai di dalam in.(...).
+    """
+    params = {}
+    for col, val in (filters or {}).items():
+        if isinstance(val, (list, tuple, set)):
+            params[col] = "in.(" + ",".join(_format_in_value(v) for v in val) + ")"
+        else:
+            params[col] = f"eq.{val}"
+    return params
+
+
+class AsyncPostgrestClient:
+    """
+    Klien PostgREST async di atas satu koneksi HTTP/2 (httpx + h2).
+    Banyak request berjalan bersamaan sebagai stream di koneksi yang sama;
+    jumlah request aktif dibatasi oleh `max_concurrency`.
+
+    Pakai sebagai async context manager:
+        async with AsyncPostgrestClient(url, key) as db:
+            await asyncio.gather(*(db.insert("tabel", chunk) for chunk in chunks))
+    """
+
+    def __init__(self, url, key, max_concurrency=DEFAULT_CONCURRENCY, timeout=60.0):
+        self.base_url = f"{url.rstrip('/')}/rest/v1"
+        self.headers = {
+            "apikey": key,
+            "Authorization": f"Bearer {key}",
+            "Content-Type": "application/json",
+        }
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._client = None
+        self._semaphore = None
+
+    async def __aenter__(self):
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            http2=True,
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=1, max_keepalive_connections=1),
+            event_hooks={"request": [atrace_request]},
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+        self._client = None
+
+    async def _request(self, method, table, params=None, json=None, prefer=None):
+        headers = {"Prefer": prefer} if prefer else None
+        async with self._semaphore:
+            response = await self._client.request(method, f"/{table}", params=params, json=json, headers=headers)
+        response.raise_for_status()
+        return response.json() if response.content else []
+
+    async def select(self, table, columns="*", filters=None, order=None, limit=None):
+        params = {"select": columns, **_filter_params(filters)}
+        if order:
+            params["order"] = order
+        if limit is not None:
+            params["limit"] = str(limit)
+        return await self._request("GET", table, params=params)
+
+    async def insert(self, table, rows, returning="minimal"):
+        return await self._request("POST", table, json=rows, prefer=f"return={returning}")
+
+    async def upsert(self, table, rows, on_conflict=None, returning="representation"):
+        params = {"on_conflict": on_conflict} if on_conflict else None
+        prefer = f"resolution=merge-duplicates,return={returning}"
+        return await self._request("POST", table, params=params, json=rows, prefer=prefer)
+
+    async def update(self, table, values, filters, returning="minimal"):
+        return await self._request(
+            "PATCH", table, params=_filter_params(filters), json=values, prefer=f"return={returning}"
+        )
+
+    async def rpc(self, function, params):
+        """Panggil fungsi database (POST /rpc/<fungsi>); satu panggilan = satu transaksi."""
+        return await self._request("POST", f"rpc/{function}", json=params)
+
+
+def run_async(coro):
+    """
+    Jalankan coroutine dari thread script Streamlit (sinkron) dan kembalikan hasilnya.
+    Jika thread ini sudah punya event loop yang berjalan, coroutine dijalankan
+    di thread terpisah.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    result = {}
+
+    def runner():
+        try:
+            result["value"] = asyncio.run(coro)
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=runner)
+    thread.start()
+    thread.join()
+    if "error" in result:
+        raise result["error"]
+    return result["value"]
@@ -0,0 +1,164 @@
+import asyncio
+import math
+import time
+
+import httpx
+
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_WORKERS = 4
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 0.5
+
+
+def to_records(df):
+    """Baris DataFrame sebagai dict siap-JSON (NaN/NA → null)."""
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
+def iter_chunks(rows, chunk_size):
+    """(indeks_awal, potongan) berurutan dari daftar baris."""
+    for start in range(0, len(rows), chunk_size):
+        yield start, rows[start:start + chunk_size]
+
+
+def is_transient(error):
+    """Gangguan jaringan / server (layak dicoba ulang), bukan data yang ditolak."""
+    if isinstance(error, httpx.HTTPStatusError):
+        code = error.response.status_code
+        return code >= 500 or code in (408, 429)
+    return isinstance(error, httpx.TransportError)
+
+
+def is_row_error(error):
+    """
+    Chunk ditolak karena isi barisnya (kode Postgres 22xxx format/tipe data,
+    23xxx constraint). Hanya error seperti ini yang layak dibelah per baris;
+    tabel/kolom tidak ada (404, PGRST204) atau akses ditolak (401/403) bukan.
+    """
+    if not isinstance(error, httpx.HTTPStatusError) or error.response.status_code not in (400, 409):
+        return False
+    try:
+        code = str(error.response.json().get("code") or "")
+    except (ValueError, AttributeError):
+        return False
+    return code.startswith(("22", "23"))
+
+
+def describe_error(error):
+    """Pesan error yang terbaca; untuk respons PostgREST pakai isi body-nya."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return f"{error.response.status_code}: {error.response.text}"
+    return str(error)
+
+
+async def _insert_with_retry(db, table, rows, retries, backoff):
+    for attempt in range(retries + 1):
+        try:
+            await db.insert(table, rows)
+            return None
+        except Exception as e:
+            if not is_transient(e) or attempt == retries:
+                return e
+            await asyncio.sleep(backoff * 2 ** attempt)
+
+
+async def insert_chunk(db, table, rows, offset=0, retries=MAX_RETRIES, backoff=BACKOFF_SECONDS):
+    """
+    Insert satu chunk dalam satu request.
+    Gangguan sementara dicoba ulang dengan backoff eksponensial. Jika chunk
+    ditolak karena datanya (is_row_error), chunk dibelah dua sampai baris yang
+    bermasalah terisolasi; error lain menggagalkan seluruh chunk tanpa dibelah.
+    Mengembalikan daftar (indeks_baris, error) yang gagal.
+    """
+    error = await _insert_with_retry(db, table, rows, retries, backoff)
+    if error is None:
+        return []
+    if len(rows) == 1 or not is_row_error(error):
+        return [(offset + i, error) for i in range(len(rows))]
+
+    mid = len(rows) // 2
+    left = await insert_chunk(db, table, rows[:mid], offset, retries, backoff)
+    right = await insert_chunk(db, table, rows[mid:], offset + mid, retries, backoff)
+    return left + right
+
+
+def _percentile(values, pct):
+    """Persentil nearest-rank; 0 jika kosong."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+async def upload_chunks(db, table, chunks, workers=DEFAULT_WORKERS, on_progress=None, on_chunk_done=None):
+    """
+    Upload chunk lewat sekumpulan worker yang membaca dari satu antrean.
+    `chunks` adalah iterable (indeks_awal, baris) dan dibaca sedikit demi sedikit:
+    antrean dibatasi 2 × workers sehingga memori tetap terbatas (backpressure).
+    on_progress(chunk_selesai, baris_selesai) dipanggil berurutan sesuai urutan
+    chunk, jadi progress hanya maju untuk awalan data yang sudah lengkap.
+    on_chunk_done(indeks_awal, baris, gagal) dipanggil begitu satu chunk selesai.
+    Error yang bukan karena isi baris (tabel/kolom tidak ada, akses ditolak, server
+    tetap gagal setelah retry) menghentikan upload: chunk berikutnya tidak dikirim.
+    Mengembalikan ringkasan: baris, gagal, error penghenti (atau None), durasi,
+    rows/sec, dan latensi p95 per chunk.
+    """
+    queue = asyncio.Queue(maxsize=workers * 2)
+    latencies = []
+    failed = []
+    finished = {}
+    state = {"next": 0, "rows": 0, "error": None}
+
+    async def producer():
+        # Chunk berikutnya diambil di thread terpisah: jika chunks adalah pipeline
+        # baca/validasi file, parsing tidak menahan event loop (request tetap berjalan)
+        iterator = iter(chunks)
+        seq = 0
+        while state["error"] is None:
+            item = await asyncio.to_thread(next, iterator, None)
+            if item is None:
+                break
+            start, chunk = item
+            await queue.put((seq, start, chunk))
+            seq += 1
+        for _ in range(workers):
+            await queue.put(None)
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            seq, start, chunk = item
+            if state["error"] is not None:
+                continue
+            t0 = time.perf_counter()
+            errors = await insert_chunk(db, table, chunk, offset=start)
+            latencies.append(time.perf_counter() - t0)
+            failed.extend(errors)
+            fatal = next((e for _, e in errors if not is_row_error(e)), None)
+            if fatal is not None and state["error"] is None:
+                state["error"] = fatal
+            if on_chunk_done:
+                on_chunk_done(start, chunk, errors)
+
+            finished[seq] = len(chunk)
+            while state["next"] in finished:
+                state["rows"] += finished.pop(state["next"])
+                state["next"] += 1
+                if on_progress:
+                    on_progress(state["next"], state["rows"])
+
+    started = time.perf_counter()
+    await asyncio.gather(producer(), *(worker() for _ in range(workers)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "rows": state["rows"],
+        "chunks": state["next"],
+        "failed": sorted(failed, key=lambda f: f[0]),
+        "error": state["error"],
+        "seconds": elapsed,
+        "rows_per_sec": state["rows"] / elapsed if elapsed > 0 else 0.0,
+        "p95_latency": _percentile(latencies, 95),
+    }
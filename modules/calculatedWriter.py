@@ -0,0 +1,142 @@
+import asyncio
+import uuid
+
+from dbConfig import get_async_db_client
+from modules.asyncPostgrest import run_async
+from modules.bulkInsert import BACKOFF_SECONDS, DEFAULT_CHUNK_SIZE, MAX_RETRIES, is_transient, iter_chunks, to_records
+from modules.tableCache import invalidate_table
+
+CALCULATED_TABLE = "calculated"
+
+# Satu baris per expert per quarter (constraint unik di sql/004_calculated_unique_nik_quarter.sql)
+CONFLICT_KEY = ("nik", "quarter")
+
+# Fungsi database yang mengganti snapshot Learning Hour satu quarter (sql/005_calculated_snapshot_runs.sql)
+SNAPSHOT_FUNCTION = "replace_learning_hour_snapshot"
+SNAPSHOT_COLUMNS = ["nik", "expert", "learning_hour", "LH"]
+
+# Fungsi database yang menulis semua komponen skor satu quarter sekaligus (sql/006_commit_quarter_scores.sql)
+QUARTER_FUNCTION = "commit_quarter_scores"
+QUARTER_COLUMNS = ["nik", "expert", "learning_hour", "LH", "variation", "expert_level"]
+
+# Jumlah nik per query pengecekan kunci yang sudah ada
+KEY_LOOKUP_SIZE = 200
+
+
+def _upsert_rows(df):
+    """
+    Baris siap-upsert: tanpa nik (tidak bisa dikunci) dan tanpa duplikat kunci
+    (satu request upsert tidak boleh mengenai baris yang sama dua kali; yang terakhir dipakai).
+    Mengembalikan (baris, jumlah_dilewati).
+    """
+    keyed = df.dropna(subset=list(CONFLICT_KEY))
+    keyed = keyed.drop_duplicates(subset=list(CONFLICT_KEY), keep="last").copy()
+    # nik bigint: kolom yang sempat berisi NaN bertipe float (12345.0 ditolak PostgREST)
+    keyed["nik"] = keyed["nik"].astype("int64")
+    return to_records(keyed), len(df) - len(keyed)
+
+
+async def _existing_keys(db, rows):
+    """(nik, quarter) yang sudah ada, dicari per kelompok nik (di bawah batas baris PostgREST)."""
+    by_quarter = {}
+    for row in rows:
+        by_quarter.setdefault(row["quarter"], []).append(row["nik"])
+    lookups = [
+        (quarter, niks[i:i + KEY_LOOKUP_SIZE])
+        for quarter, niks in by_quarter.items()
+        for i in range(0, len(niks), KEY_LOOKUP_SIZE)
+    ]
+    found = await asyncio.gather(*(
+        db.select(CALCULATED_TABLE, columns="nik", filters={"quarter": quarter, "nik": niks})
+        for quarter, niks in lookups
+    ))
+    return {(r["nik"], quarter) for (quarter, _), result in zip(lookups, found) for r in result}
+
+
+async def _upsert(rows, chunk_size):
+    async with get_async_db_client() as db:
+        before = await _existing_keys(db, rows)
+        responses = await asyncio.gather(*(
+            db.upsert(CALCULATED_TABLE, chunk, on_conflict=",".join(CONFLICT_KEY), returning="representation")
+            for _, chunk in iter_chunks(rows, chunk_size)
+        ))
+    # Baris yang dikembalikan upsert = baris yang benar-benar ditulis
+    written = [(r["nik"], r["quarter"]) for response in responses for r in response]
+    updated = sum(1 for key in written if key in before)
+    return {"inserted": len(written) - updated, "updated": updated}
+
+
+def upsert_calculated(df, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Tulis skor ke tabel 'calculated' secara bulk: insert baris baru dan perbarui
+    kolom yang dikirim pada baris (nik, quarter) yang sudah ada. Kolom lain pada
+    baris lama tidak disentuh. Mengembalikan {"inserted", "updated", "skipped"}.
+    """
+    rows, skipped = _upsert_rows(df)
+    if not rows:
+        return {"inserted": 0, "updated": 0, "skipped": skipped}
+    result = run_async(_upsert(rows, chunk_size))
+    invalidate_table(CALCULATED_TABLE)
+    result["skipped"] = skipped
+    return result
+
+
+async def _rpc_with_retry(function, params, retries=MAX_RETRIES, backoff=BACKOFF_SECONDS):
+    async with get_async_db_client() as db:
+        for attempt in range(retries + 1):
+            try:
+                return await db.rpc(function, params)
+            except Exception as e:
+                # run_id yang sama: jika percobaan sebelumnya ternyata sudah ter-commit, tidak ditulis ulang
+                if not is_transient(e) or attempt == retries:
+                    raise
+                await asyncio.sleep(backoff * 2 ** attempt)
+
+
+def replace_learning_hour_run(df, quarter):
+    """
+    Simpan skor Learning Hour satu quarter sebagai run baru yang menggantikan run
+    sebelumnya secara atomik: baris expert di-upsert, nilai Learning Hour expert
+    yang tidak ada di run ini dikosongkan, dan run dicatat di calculated_runs.
+    Mengembalikan {"run_id", "inserted", "updated", "cleared", "skipped"}.
+    """
+    rows, skipped = _upsert_rows(df.assign(quarter=quarter))
+    run_id = str(uuid.uuid4())
+    params = {
+        "p_quarter": quarter,
+        "p_run_id": run_id,
+        "p_rows": [{col: row.get(col) for col in SNAPSHOT_COLUMNS} for row in rows],
+    }
+    result = run_async(_rpc_with_retry(SNAPSHOT_FUNCTION, params))
+    invalidate_table(CALCULATED_TABLE)
+    return {
+        "run_id": run_id,
+        "inserted": result["inserted"],
+        "updated": result["updated"],
+        "cleared": result["cleared"],
+        "skipped": skipped,
+    }
+
+
+def commit_quarter_scores(df, quarter):
+    """
+    Tulis semua komponen skor satu quarter (learning_hour, LH, variation, expert_level)
+    dalam satu request transaksional. Baris calculated quarter itu yang tidak ada di
+    `df` dihapus. Mengembalikan {"run_id", "inserted", "updated", "removed", "skipped"}.
+    """
+    rows, skipped = _upsert_rows(df.assign(quarter=quarter))
+    run_id = str(uuid.uuid4())
+    params = {
+        "p_quarter": quarter,
+        "p_run_id": run_id,
+        "p_rows": [{col: row.get(col) for col in QUARTER_COLUMNS} for row in rows],
+    }
+    result = run_async(_rpc_with_retry(QUARTER_FUNCTION, params))
+    invalidate_table(CALCULATED_TABLE)
+    return {
+        "run_id": run_id,
+        "inserted": result["inserted"],
+        "updated": result["updated"],
+        "removed": result["removed"],
+        "skipped": skipped,
+    }
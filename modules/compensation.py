@@ -1,9 +1,8 @@
 import streamlit as st
 import pandas as pd
 import io
-from dbConfig import get_db_connection
-from google import genai
 from dataManager import load_all_data
+from modules.fileIngest import UPLOAD_TYPES, read_and_merge
 import locale
 
 try:
@@ -15,13 +14,17 @@ def compensation_page():
     st.title("Compensation")
     options = ["Upload file","From Data Base"]
     mode = st.pills("Data Resource", options, selection_mode="single", default="From Data Base")
+
+    # === Pilih Quarter terkini ===
+    quarter=["Q1", "Q2", "Q3", "Q4"]
+    quarter = st.pills("Pilih Quarter", quarter, selection_mode="single", default="Q1")
     if mode == "Upload file":   
         st.header("📊 Upload File")
 
         uploaded_files = st.file_uploader(
-            "Upload data (format Excel)", 
+            "Upload data (Excel, CSV/TSV, atau Parquet)", 
             accept_multiple_files=True, 
-            type=["xls", "xlsx"]
+            type=UPLOAD_TYPES
         )
         # Simpan hasil upload ke session_state agar tidak hilang setelah interaksi
         if uploaded_files:
@@ -30,7 +33,11 @@ def compensation_page():
         combined_df = st.session_state.get("combined_df", pd.DataFrame())
     elif mode == "From Data Base":
         viewTable="calculated"
-        combined_df = load_all_data(viewTable)
+        combined_df = load_all_data(
+            viewTable,
+            columns=["nik", "expert", "LH", "learning_hour", "variation", "expert_level", "quarter"],
+            filters={"quarter": quarter},
+        )
     if combined_df.empty:
         st.info("Tidak terdapat data")
     else:
@@ -50,9 +57,6 @@ def compensation_page():
             """, unsafe_allow_html=True)
     st.empty
 
-    # === Pilih Quarter terkini ===
-    quarter=["Q1", "Q2", "Q3", "Q4"]
-    quarter = st.pills("Pilih Quarter", quarter, selection_mode="single", default="Q1")
     combined_df = combined_df[combined_df["quarter"]==quarter]
     
     st.header("Komponen Parameter")
@@ -0,0 +1,68 @@
+import threading
+
+import streamlit as st
+
+# Penghitung proses-wide: berapa koneksi TCP / handshake TLS yang benar-benar dibuka,
+# dibandingkan jumlah request HTTP (request yang memakai ulang koneksi tidak menambah handshake)
+_counts = {"requests": 0, "tcp": 0, "tls": 0}
+_lock = threading.Lock()
+
+
+def _record(event_name):
+    key = None
+    if event_name == "connection.connect_tcp.complete":
+        key = "tcp"
+    elif event_name == "connection.start_tls.complete":
+        key = "tls"
+    if key:
+        with _lock:
+            _counts[key] += 1
+
+
+def _trace(event_name, info):
+    _record(event_name)
+
+
+async def _atrace(event_name, info):
+    _record(event_name)
+
+
+def trace_request(request):
+    """Event hook httpx (sync): pasang tracer httpcore dan hitung request."""
+    with _lock:
+        _counts["requests"] += 1
+    request.extensions["trace"] = _trace
+
+
+async def atrace_request(request):
+    """Event hook httpx (async): sama seperti trace_request."""
+    with _lock:
+        _counts["requests"] += 1
+    request.extensions["trace"] = _atrace
+
+
+def snapshot():
+    with _lock:
+        return dict(_counts)
+
+
+def mark_rerun_start():
+    """Catat posisi penghitung di awal rerun (dipanggil di awal tiap halaman)."""
+    st.session_state["_connection_stats_start"] = snapshot()
+
+
+def show_connection_stats():
+    """
+    Tampilkan di sidebar jumlah request, koneksi TCP, dan handshake TLS
+    sejak mark_rerun_start() pada rerun ini. Dipanggil di akhir tiap halaman.
+    Penghitungnya proses-wide: sesi lain, antrean tulis latar, dan thread upload
+    yang berjalan bersamaan ikut terhitung, jadi angkanya diberi label begitu.
+    """
+    current = snapshot()
+    start = st.session_state.get("_connection_stats_start", current)
+    delta = {k: current[k] - start.get(k, 0) for k in current}
+    st.sidebar.caption(
+        f"🔌 Selama rerun ini (seluruh proses, termasuk sesi lain & tugas latar): "
+        f"{delta['requests']} request, {delta['tcp']} koneksi TCP, {delta['tls']} handshake TLS "
+        f"(total proses: {current['tcp']} TCP / {current['tls']} TLS)"
+    )
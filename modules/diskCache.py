@@ -0,0 +1,157 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+import pyarrow as pa
+
+from modules.dtypePlan import ARROW_STRING
+
+# File Arrow IPC per (tabel, query) agar restart server / worker lain mulai dari salinan lokal
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "tables"
+# Sama dengan tableCache.DEFAULT_TTL: salinan disk tidak boleh lebih basi dari cache memori
+DEFAULT_TTL = 600
+SNAPSHOT_KEY = ("__snapshot__",)
+
+_META_KEY = b"exman_cache"
+
+
+def _path_for(table_name, query_key):
+    digest = hashlib.sha1(repr(query_key).encode("utf-8")).hexdigest()[:16]
+    return CACHE_DIR / f"{table_name}__{digest}.arrow"
+
+
+def put(table_name, query_key, df, meta=None):
+    """
+    Simpan DataFrame sebagai file Arrow IPC (tanpa kompresi agar bisa di-mmap).
+    Mengembalikan False jika DataFrame tidak bisa dikonversi ke Arrow
+    (mis. kolom object berisi campuran angka dan teks).
+    """
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return False
+
+    info = {
+        "table": table_name,
+        "query": repr(query_key),
+        "saved_at": time.time(),
+        "meta": meta or {},
+        # Arrow → pandas mengembalikan string[python]; kolom ini dikembalikan ke string[pyarrow] saat dibaca
+        "arrow_strings": [col for col, dtype in df.dtypes.items() if dtype == ARROW_STRING],
+    }
+    schema_meta = dict(table.schema.metadata or {})
+    schema_meta[_META_KEY] = json.dumps(info, default=str).encode("utf-8")
+    table = table.replace_schema_metadata(schema_meta)
+
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    path = _path_for(table_name, query_key)
+    tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    # Rename atomik: pembaca di proses lain tidak pernah melihat file setengah jadi
+    os.replace(tmp_path, path)
+    return True
+
+
+def _read_info(reader):
+    raw = (reader.schema.metadata or {}).get(_META_KEY)
+    return json.loads(raw) if raw else {}
+
+
+def get(table_name, query_key, ttl=DEFAULT_TTL):
+    """
+    Baca (DataFrame, meta) dari file cache lewat memory-map, atau None jika
+    tidak ada / lebih tua dari ttl detik (ttl=None → tidak pernah kadaluarsa).
+    """
+    path = _path_for(table_name, query_key)
+    if not path.exists():
+        return None
+    if ttl is not None and time.time() - path.stat().st_mtime > ttl:
+        return None
+    try:
+        with pa.memory_map(str(path), "r") as source:
+            reader = pa.ipc.open_file(source)
+            info = _read_info(reader)
+            df = reader.read_all().to_pandas()
+    except (OSError, pa.ArrowInvalid):
+        return None
+    strings = [col for col in info.get("arrow_strings", []) if col in df.columns]
+    if strings:
+        df = df.astype({col: ARROW_STRING for col in strings})
+    return df, info.get("meta", {})
+
+
+def invalidate(table_name, keep_snapshot=True):
+    """Hapus file cache milik satu tabel."""
+    if not CACHE_DIR.exists():
+        return
+    snapshot_path = _path_for(table_name, SNAPSHOT_KEY)
+    for path in CACHE_DIR.glob(f"{table_name}__*.arrow"):
+        if keep_snapshot and path == snapshot_path:
+            continue
+        path.unlink(missing_ok=True)
+
+
+def entries():
+    """Daftar isi cache: tabel, query, jumlah baris, ukuran file, umur."""
+    result = []
+    if not CACHE_DIR.exists():
+        return result
+    for path in sorted(CACHE_DIR.glob("*.arrow")):
+        stat = path.stat()
+        try:
+            with pa.memory_map(str(path), "r") as source:
+                reader = pa.ipc.open_file(source)
+                info = _read_info(reader)
+                rows = sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+        except (OSError, pa.ArrowInvalid):
+            info, rows = {}, None
+        result.append({
+            "file": path.name,
+            "table": info.get("table", "?"),
+            "query": info.get("query", "?"),
+            "rows": rows,
+            "bytes": stat.st_size,
+            "age_s": int(time.time() - stat.st_mtime),
+        })
+    return result
+
+
+def _format_bytes(n):
+    if n < 1024:
+        return f"{n} B"
+    for unit in ["KB", "MB", "GB"]:
+        n /= 1024
+        if n < 1024 or unit == "GB":
+            return f"{n:.1f} {unit}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Isi cache tabel di disk (.cache/tables).")
+    parser.add_argument("--clear", metavar="TABLE", nargs="?", const="*", help="hapus cache (semua atau satu tabel)")
+    args = parser.parse_args(argv)
+
+    if args.clear:
+        for path in CACHE_DIR.glob("*.arrow" if args.clear == "*" else f"{args.clear}__*.arrow"):
+            path.unlink(missing_ok=True)
+        print("Cache dibersihkan.")
+        return
+
+    items = entries()
+    if not items:
+        print(f"Cache kosong ({CACHE_DIR}).")
+        return
+    print(f"{'TABLE':<20} {'ROWS':>9} {'SIZE':>10} {'AGE':>8}  QUERY")
+    for item in items:
+        rows = "-" if item["rows"] is None else item["rows"]
+        print(f"{item['table']:<20} {rows:>9} {_format_bytes(item['bytes']):>10} {item['age_s']:>7}s  {item['query']}")
+    total = sum(item["bytes"] for item in items)
+    print(f"\n{len(items)} file, total {_format_bytes(total)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+# Rencana dtype per tabel:
+#   category → teks berulang dengan sedikit nilai unik (label quarter, unit, teks pertanyaan)
+#   string   → teks bebas / kunci groupby, disimpan sebagai string berbasis Arrow
+#   numeric  → angka yang di-downcast (bilangan bulat → int32, pecahan tetap float64)
+TABLE_DTYPES = {
+    "learningImpact1": {
+        "category": ["Question", "Quarter", "Unit"],
+        "string": ["Email", "Answer", "Event", "Expert"],
+        "numeric": [],
+    },
+    "learningHour_new": {
+        "category": ["quarter", "company"],
+        "string": ["expert", "event", "variasi"],
+        "numeric": ["nik", "learningHour", "profLevel"],
+    },
+    "calculated": {
+        "category": ["quarter"],
+        "string": ["expert"],
+        "numeric": ["nik", "LH", "learning_hour", "variation", "expert_level"],
+    },
+    "expert_level": {
+        "category": [],
+        "string": ["nama"],
+        "numeric": ["level"],
+    },
+}
+
+ARROW_STRING = "string[pyarrow]"
+
+
+def downcast_numeric(series):
+    """Bilangan bulat → int32 (nullable Int32 jika ada NA); pecahan dibiarkan float64."""
+    values = pd.to_numeric(series, errors="coerce")
+    non_null = values.dropna()
+    if non_null.empty or not np.all(np.mod(non_null, 1) == 0):
+        return values.astype("float64") if values.dtype == object else values
+    lo, hi = non_null.min(), non_null.max()
+    fits_int32 = np.iinfo(np.int32).min <= lo and hi <= np.iinfo(np.int32).max
+    if values.isna().any():
+        return values.astype("Int32" if fits_int32 else "Int64")
+    return values.astype("int32" if fits_int32 else "int64")
+
+
+def memory_bytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def apply_dtype_plan(table_name, df):
+    """
+    Terapkan rencana dtype tabel pada DataFrame.
+    Mengembalikan (DataFrame, byte_sebelum, byte_sesudah).
+    Tabel tanpa rencana dikembalikan apa adanya.
+    """
+    plan = TABLE_DTYPES.get(table_name)
+    before = memory_bytes(df)
+    if not plan or df.empty:
+        return df, before, before
+
+    df = df.copy()
+    for col in plan["numeric"]:
+        if col in df.columns:
+            df[col] = downcast_numeric(df[col])
+    for col in plan["string"]:
+        if col in df.columns:
+            # Nilai non-teks (mis. jawaban angka dari JSON) dijadikan teks lebih dulu
+            df[col] = df[col].map(lambda v: v if isinstance(v, str) or pd.isna(v) else str(v)).astype(ARROW_STRING)
+    for col in plan["category"]:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df, before, memory_bytes(df)
@@ -0,0 +1,266 @@
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pandas as pd
+
+from modules.dtypePlan import ARROW_STRING, downcast_numeric
+
+# Ekstensi yang diterima semua uploader (format dideteksi dari ekstensi file)
+UPLOAD_TYPES = ["xlsx", "xls", "csv", "tsv", "parquet"]
+
+# Ukuran potongan baris untuk ingest streaming
+DEFAULT_CHUNK_ROWS = 5000
+
+# Parsing file (terutama Excel/openpyxl) terikat CPU dan single-thread → file dibaca paralel
+# di pool proses yang dipakai bersama oleh semua halaman
+MAX_WORKERS = max(1, min(8, (os.cpu_count() or 1)))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: aman dipakai dari proses Streamlit yang punya banyak thread
+            _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _reset_pool(broken):
+    """Buang pool yang rusak (worker mati, mis. kehabisan memori); pemakaian berikutnya membuat pool baru."""
+    global _pool
+    with _pool_lock:
+        if _pool is broken:
+            _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _submit_all(payload, column_mapping, dtypes):
+    pool = _get_pool()
+    try:
+        return pool, [pool.submit(_read_one, name, content, column_mapping, dtypes) for name, content in payload]
+    except BrokenProcessPool:
+        # Pool sudah rusak oleh pemakaian sebelumnya → coba sekali lagi dengan pool baru
+        _reset_pool(pool)
+        pool = _get_pool()
+        return pool, [pool.submit(_read_one, name, content, column_mapping, dtypes) for name, content in payload]
+
+
+def parse_filename(name):
+    """Metadata dari nama file event_expert_unit_quarter.<ekstensi>."""
+    file_name = name.rsplit(".", 1)[0]
+    parts = file_name.split("_")
+    event, expert, unit, quarter = (parts + ["", "", "", ""])[:4]
+    return {"Event": event, "Expert": expert, "Unit": unit, "Quarter": quarter}
+
+
+def _as_buffer(source):
+    """bytes → BytesIO; objek file (mis. UploadedFile Streamlit) dipakai langsung dari awal tanpa disalin."""
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    source.seek(0)
+    return source
+
+
+def _normalize(col):
+    return str(col).strip().lower()
+
+
+def _typed_series(values, dtype):
+    """Bangun kolom langsung dengan dtype target (tanpa tahap kolom object penuh)."""
+    if dtype == "numeric":
+        return downcast_numeric(pd.Series(values, dtype=object))
+    if dtype in (ARROW_STRING, "string"):
+        values = [v if isinstance(v, str) else (None if pd.isna(v) else str(v)) for v in values]
+    return pd.Series(values, dtype=dtype)
+
+
+def _iter_xlsx(content, column_mapping, dtypes, chunk_rows=None):
+    """
+    Baca sheet pertama dengan openpyxl mode read_only (baris di-stream, memori
+    terbatas) dan simpan hanya kolom yang ada di column_mapping.
+    Yield DataFrame per chunk_rows baris (None = satu DataFrame untuk seluruh sheet).
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(_as_buffer(content), read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None) or ()
+
+        # indeks kolom sumber → nama kolom DB (kolom pertama yang cocok yang dipakai)
+        selected = {}
+        for i, col in enumerate(header):
+            target = column_mapping.get(_normalize(col)) if col is not None else None
+            if target is not None and target not in selected.values():
+                selected[i] = target
+
+        def build(columns):
+            return pd.DataFrame({
+                target: _typed_series(values, dtypes.get(target, "object"))
+                for target, values in columns.items()
+            })
+
+        columns = {target: [] for target in selected.values()}
+        count = 0
+        for row in rows:
+            if not any(v is not None for v in row):
+                continue
+            for i, target in selected.items():
+                columns[target].append(row[i] if i < len(row) else None)
+            count += 1
+            if chunk_rows and count == chunk_rows:
+                yield build(columns)
+                columns = {target: [] for target in selected.values()}
+                count = 0
+    finally:
+        wb.close()
+
+    if count or not chunk_rows:
+        yield build(columns)
+
+
+def _read_xlsx_streaming(content, column_mapping, dtypes):
+    return next(_iter_xlsx(content, column_mapping, dtypes))
+
+
+def _apply_mapping(df, column_mapping, dtypes):
+    """Normalisasi + mapping nama kolom, lalu terapkan dtype target."""
+    df.columns = [_normalize(col) for col in df.columns]
+    df = df.rename(columns=lambda c: column_mapping.get(c, c))
+    # Index 0..n-1: potongan read_csv melanjutkan index file, sedangkan seri bertipe dibuat dari list
+    df = df.loc[:, ~df.columns.duplicated()].reset_index(drop=True)
+    for col, dtype in dtypes.items():
+        if col in df.columns:
+            df[col] = _typed_series(df[col].tolist(), dtype)
+    return df
+
+
+def _read_table(name, content, column_mapping):
+    """Baca file sesuai ekstensinya; dengan column_mapping hanya kolom yang dipetakan."""
+    ext = name.rsplit(".", 1)[-1].lower()
+    buffer = _as_buffer(content)
+    usecols = (lambda c: _normalize(c) in column_mapping) if column_mapping is not None else None
+
+    if ext in ("csv", "tsv"):
+        return pd.read_csv(buffer, sep="\t" if ext == "tsv" else ",", usecols=usecols)
+    if ext == "parquet":
+        columns = None
+        if column_mapping is not None:
+            import pyarrow.parquet as pq
+            columns = [c for c in pq.read_schema(buffer).names if usecols(c)]
+            buffer.seek(0)
+        return pd.read_parquet(buffer, columns=columns)
+    # xls / xlsx tanpa mapping
+    return pd.read_excel(buffer, usecols=usecols)
+
+
+def _read_one(name, content, column_mapping=None, dtypes=None):
+    """
+    Baca satu file (dijalankan di proses worker); format ditentukan dari ekstensi.
+    Dengan column_mapping hanya kolom yang dipetakan yang dibaca, dan dtypes
+    ({kolom: dtype | "numeric"}) langsung diterapkan saat membaca.
+    Mengembalikan (nama, DataFrame, None) atau (nama, None, pesan_error).
+    """
+    dtypes = dtypes or {}
+    try:
+        if column_mapping is not None and name.lower().endswith((".xlsx", ".xlsm")):
+            df = _read_xlsx_streaming(content, column_mapping, dtypes)
+        else:
+            df = _read_table(name, content, column_mapping)
+            if column_mapping is not None:
+                df = _apply_mapping(df, column_mapping, dtypes)
+    except Exception as e:
+        return name, None, str(e)
+
+    # Tambahkan kolom metadata dari nama file
+    for col, value in parse_filename(name).items():
+        df[col] = value
+    return name, df, None
+
+
+def iter_file_chunks(name, content, column_mapping, dtypes=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Baca satu file per potongan baris (≤ chunk_rows) agar memori tetap datar:
+    hanya kolom yang dipetakan, dtype target, dan metadata nama file.
+    `content` berupa bytes atau objek file yang bisa di-seek (dibaca langsung).
+    CSV/TSV dan Parquet dibaca bertahap oleh reader-nya; .xls (tidak bisa
+    di-stream) dibaca utuh lalu dipotong.
+    """
+    dtypes = dtypes or {}
+    ext = name.rsplit(".", 1)[-1].lower()
+    usecols = lambda c: _normalize(c) in column_mapping
+
+    if ext in ("xlsx", "xlsm"):
+        frames = _iter_xlsx(content, column_mapping, dtypes, chunk_rows)
+    elif ext in ("csv", "tsv"):
+        reader = pd.read_csv(_as_buffer(content), sep="\t" if ext == "tsv" else ",", usecols=usecols, chunksize=chunk_rows)
+        frames = (_apply_mapping(df, column_mapping, dtypes) for df in reader)
+    elif ext == "parquet":
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(_as_buffer(content))
+        columns = [c for c in parquet.schema_arrow.names if usecols(c)]
+        frames = (
+            _apply_mapping(batch.to_pandas(), column_mapping, dtypes)
+            for batch in parquet.iter_batches(batch_size=chunk_rows, columns=columns)
+        )
+    else:
+        df = _apply_mapping(_read_table(name, content, column_mapping), column_mapping, dtypes)
+        frames = (df.iloc[i:i + chunk_rows].reset_index(drop=True) for i in range(0, len(df), chunk_rows))
+
+    meta = parse_filename(name)
+    for df in frames:
+        for col, value in meta.items():
+            df[col] = value
+        yield df
+
+
+def read_files(files, column_mapping=None, dtypes=None):
+    """
+    Baca banyak file upload secara paralel (satu file per proses worker).
+    `files` berisi objek dengan .name dan .getvalue() (UploadedFile Streamlit).
+    Mengembalikan (daftar DataFrame berurutan sesuai files, daftar (nama, error)).
+    Jika proses worker mati, file yang belum selesai dilaporkan satu per satu.
+    """
+    payload = [(f.name, f.getvalue()) for f in files]
+    if len(payload) <= 1:
+        results = [_read_one(name, content, column_mapping, dtypes) for name, content in payload]
+    else:
+        pool, futures = _submit_all(payload, column_mapping, dtypes)
+        results = []
+        broken = False
+        for (name, _), future in zip(payload, futures):
+            try:
+                results.append(future.result())
+            except BrokenProcessPool:
+                broken = True
+                results.append((name, None, "proses pembaca file berhenti mendadak (mis. kehabisan memori)"))
+        if broken:
+            _reset_pool(pool)
+
+    frames = [df for _, df, error in results if error is None]
+    errors = [(name, error) for name, _, error in results if error is not None]
+    return frames, errors
+
+
+def read_and_merge(files, column_mapping=None, dtypes=None):
+    """Baca dan gabungkan file upload; file yang gagal dibaca dilaporkan satu per satu."""
+    # streamlit diimpor di sini agar proses worker (spawn) tidak ikut memuatnya
+    import streamlit as st
+
+    frames, errors = read_files(files, column_mapping, dtypes)
+    for name, error in errors:
+        st.error(f"Gagal membaca file {name}: {error}")
+
+    if frames:
+        combined = pd.concat(frames, ignore_index=True)
+        combined["Event"] = combined["Event"].fillna("").astype(str).str.strip()
+        return combined
+    else:
+        return pd.DataFrame()
@@ -0,0 +1,93 @@
+import builtins
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+
+# Laporan import terakhir yang benar-benar memuat modul baru, per halaman
+# (rerun berikutnya memakai sys.modules sehingga biayanya ~0)
+_reports = {}
+_lock = threading.Lock()
+
+
+class ImportReport:
+    """Waktu import per modul, mirip `python -X importtime` (self dan kumulatif, dalam detik)."""
+
+    def __init__(self, page):
+        self.page = page
+        self.entries = []  # (nama_modul, self_s, kumulatif_s, kedalaman)
+        self.total = 0.0
+
+    @property
+    def modules_loaded(self):
+        return len(self.entries)
+
+    def top(self, n=10):
+        return sorted(self.entries, key=lambda e: e[2], reverse=True)[:n]
+
+    def to_text(self):
+        lines = ["import time:       self [us] |  cumulative | imported package"]
+        for name, self_s, cum_s, depth in self.entries:
+            lines.append(f"import time: {self_s * 1e6:10.0f} | {cum_s * 1e6:11.0f} | {'  ' * depth}{name}")
+        return "\n".join(lines)
+
+
+@contextmanager
+def import_report(page):
+    """
+    Ukur import di dalam blok `with` untuk satu halaman:
+
+        with import_report("Compensation"):
+            from modules.compensation import compensation_page
+
+    Hanya modul yang belum ada di sys.modules yang dicatat.
+    """
+    report = ImportReport(page)
+    stack = []
+    owner = threading.get_ident()
+
+    with _lock:
+        original_import = builtins.__import__
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if threading.get_ident() != owner or level > 0 or name in sys.modules:
+                return original_import(name, globals, locals, fromlist, level)
+            stack.append(0.0)
+            depth = len(stack) - 1
+            start = time.perf_counter()
+            try:
+                return original_import(name, globals, locals, fromlist, level)
+            finally:
+                cumulative = time.perf_counter() - start
+                children = stack.pop()
+                if stack:
+                    stack[-1] += cumulative
+                report.entries.append((name, cumulative - children, cumulative, depth))
+
+        builtins.__import__ = timed_import
+        start = time.perf_counter()
+        try:
+            yield report
+        finally:
+            report.total = time.perf_counter() - start
+            builtins.__import__ = original_import
+
+    if report.entries:
+        _reports[page] = report
+
+
+def show_import_report(page):
+    """Tampilkan laporan import dingin terakhir halaman ini di sidebar."""
+    report = _reports.get(page)
+    if report is None:
+        return
+    with st.sidebar.expander(f"⏱️ Import halaman: {report.total * 1000:.0f} ms"):
+        st.caption(f"{report.modules_loaded} modul dimuat saat import dingin terakhir.")
+        st.dataframe(
+            [{"Modul": name, "Kumulatif (ms)": round(cum * 1000, 1), "Self (ms)": round(own * 1000, 1)}
+             for name, own, cum, _ in report.top()],
+            hide_index=True,
+        )
+        st.download_button("📥 Unduh laporan", report.to_text(), file_name=f"importtime_{page}.txt")
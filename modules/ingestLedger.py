@@ -0,0 +1,123 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Ledger file yang sudah pernah masuk ke database: {tabel: {sha256: info}}
+LEDGER_PATH = Path(__file__).resolve().parent.parent / ".cache" / "uploads" / "ledger.json"
+
+# Kolom yang menentukan satu jawaban LIM1 unik
+ROW_KEY = ["Email", "Event", "Question", "Answer", "Expert", "Quarter"]
+
+# Ukuran blok saat menghitung hash file dari objek file (1 MB)
+HASH_BLOCK_SIZE = 1 << 20
+
+_lock = threading.Lock()
+
+
+def file_hash(content):
+    """sha256 isi file; objek file dibaca per blok (tanpa menyalin seluruh isinya)."""
+    if isinstance(content, (bytes, bytearray)):
+        return hashlib.sha256(content).hexdigest()
+    digest = hashlib.sha256()
+    content.seek(0)
+    for block in iter(lambda: content.read(HASH_BLOCK_SIZE), b""):
+        digest.update(block)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def _load():
+    try:
+        with open(LEDGER_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save(ledger):
+    LEDGER_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = LEDGER_PATH.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(ledger, f)
+    os.replace(tmp_path, LEDGER_PATH)
+
+
+def split_new_files(files, table_name):
+    """
+    Pisahkan file upload menjadi (baru, sudah_pernah_masuk) berdasarkan hash isinya,
+    tanpa membaca isi file. Elemen berupa (file, sha256).
+    """
+    ingested = _load().get(table_name, {})
+    fresh, skipped = [], []
+    for f in files:
+        digest = file_hash(f)
+        (skipped if digest in ingested else fresh).append((f, digest))
+    return fresh, skipped
+
+
+def record_files(table_name, entries):
+    """Catat file (nama, sha256) yang isinya sudah lengkap masuk ke tabel."""
+    with _lock:
+        ledger = _load()
+        table = ledger.setdefault(table_name, {})
+        for name, digest in entries:
+            table[digest] = {"name": name, "ingested_at": time.time()}
+        _save(ledger)
+
+
+def dedupable_rows(df, key=ROW_KEY):
+    """
+    Baris yang boleh dibuang sebagai duplikat. Jawaban anonim (Email kosong / "empty")
+    tidak bisa dibedakan dari responden lain yang menjawab sama, jadi selalu disimpan;
+    file yang sama tetap tertahan oleh ledger sha256 (split_new_files).
+    """
+    if "Email" not in key or "Email" not in df.columns:
+        return pd.Series(True, index=df.index)
+    email = df["Email"].astype("string").str.strip().str.lower()
+    return ~(email.isna() | email.isin(["", "empty"]))
+
+
+def row_hashes(df, key=ROW_KEY):
+    """Hash 64-bit per baris atas kolom kunci (nilai kosong diperlakukan sebagai 'empty')."""
+    values = df[key].copy()
+    for col in key:
+        # Angka ditulis seragam: 2 (int dari upload) dan 2.0 (float dari database) harus sama
+        if pd.api.types.is_numeric_dtype(values[col]) and not pd.api.types.is_bool_dtype(values[col]):
+            values[col] = values[col].astype("Float64")
+    values = values.astype("string").fillna("empty")
+    return pd.util.hash_pandas_object(values, index=False)
+
+
+def duplicate_mask(df, existing=None, key=ROW_KEY):
+    """
+    Mask baris yang dipertahankan: bukan duplikat di dalam batch dan belum ada
+    di `existing` (jawaban anonim tidak ikut di-dedupe, lihat dedupable_rows).
+    Mengembalikan (mask numpy, jumlah_duplikat_batch, jumlah_sudah_ada).
+    """
+    if df.empty:
+        return np.ones(0, dtype=bool), 0, 0
+    hashes = row_hashes(df, key)
+    dedupable = dedupable_rows(df, key).to_numpy()
+    in_batch = hashes.duplicated().to_numpy() & dedupable
+    if existing is not None and not existing.empty:
+        in_db = hashes.isin(set(row_hashes(existing, key))).to_numpy() & dedupable & ~in_batch
+    else:
+        in_db = np.zeros(len(df), dtype=bool)
+    return ~(in_batch | in_db), int(in_batch.sum()), int(in_db.sum())
+
+
+def drop_duplicate_rows(df, existing=None, key=ROW_KEY):
+    """
+    Buang baris yang duplikat di dalam batch dan yang sudah ada di `existing`.
+    Mengembalikan (DataFrame, jumlah_duplikat_batch, jumlah_sudah_ada).
+    """
+    if df.empty:
+        return df, 0, 0
+    keep, dup_batch, dup_db = duplicate_mask(df, existing, key)
+    return df[keep].reset_index(drop=True), dup_batch, dup_db
@@ -1,49 +1,25 @@
 import streamlit as st
 import pandas as pd
 import io
-from dbConfig import get_db_connection
-from google import genai
 from dataManager import load_all_data
+from modules.fileIngest import UPLOAD_TYPES, read_and_merge
+from modules.calculatedWriter import replace_learning_hour_run
+from modules.quarterScores import learning_hour_scores
+from modules.writeBehind import submit_write
 
 def learning_hour_page():
-    supabase = get_db_connection()
-    def read_and_merge(files):
-        all_data = []
-        for uploaded_file in files:
-            try:
-                df = pd.read_excel(uploaded_file)
-            except Exception as e:
-                st.error(f"Gagal membaca file {uploaded_file.name}: {e}")
-                continue
-            # Ambil nama file tanpa ekstensi
-            file_name = uploaded_file.name.rsplit(".", 1)[0]
-            parts = file_name.split("_")
-            event, expert, unit,quarter = (parts + ["", "", "", ""])[:4]
-
-            # Tambahkan kolom metadata
-            df["Event"] = event
-            df["Expert"] = expert
-            df["Unit"] = unit
-            df["Quarter"] = quarter
-            all_data.append(df)
-
-        if all_data:
-            combined = pd.concat(all_data, ignore_index=True)
-            combined["Event"] = combined["Event"].fillna("").astype(str).str.strip()
-            return combined
-        else:
-            return pd.DataFrame()
-    
     st.title("Learning Hours")  
     options = ["Upload file","From Data Base"]
     mode = st.pills("Data Resource", options, selection_mode="single", default="From Data Base")
+    quarter=["Q1", "Q2", "Q3", "Q4"]
+    quarter = st.pills("Pilih Quarter", quarter, selection_mode="single", default="Q1")
     if mode == "Upload file":   
         st.header("📊 Upload File")
 
         uploaded_files = st.file_uploader(
-            "Upload data (format Excel)", 
+            "Upload data (Excel, CSV/TSV, atau Parquet)", 
             accept_multiple_files=True, 
-            type=["xls", "xlsx"]
+            type=UPLOAD_TYPES
         )
         # Simpan hasil upload ke session_state agar tidak hilang setelah interaksi
         if uploaded_files:
@@ -53,7 +29,27 @@ def learning_hour_page():
     elif mode == "From Data Base":
         # viewTable="learningHour"
         viewTable="learningHour_new"
-        combined_df = load_all_data(viewTable)
+
+        # Preview sementara selama data masih diambil per batch
+        preview = st.empty()
+        running = {"learningHour": 0, "experts": set()}
+        def render_partial(chunk, total_rows):
+            running["learningHour"] += chunk["learningHour"].sum()
+            running["experts"].update(chunk["expert"].dropna().unique())
+            with preview.container():
+                st.caption(
+                    f"⏳ {total_rows} baris dimuat — sementara {running['learningHour']} Learning Hour "
+                    f"dari {len(running['experts'])} expert, data masih diambil..."
+                )
+                st.dataframe(chunk.tail(10), use_container_width=True)
+
+        combined_df = load_all_data(
+            viewTable,
+            columns=["nik", "expert", "event", "variasi", "learningHour", "quarter"],
+            filters={"quarter": quarter},
+            on_chunk=render_partial,
+        )
+        preview.empty()
     if combined_df.empty:
         st.info("Tidak terdapat data")
     else:
@@ -75,7 +71,7 @@ def learning_hour_page():
     filter=["All", "LIM 1"]
     filter = st.pills("Filter", filter, selection_mode="single", default="All")
     if filter == "LIM 1":
-        event_df = load_all_data("learningImpact1")
+        event_df = load_all_data("learningImpact1", incremental=True, columns=["Event"])
         unique_events = event_df["Event"].dropna().unique().tolist()
         st.write("📅 Daftar Event LIM 1:")
         unique_events_df = pd.DataFrame({
@@ -88,35 +84,10 @@ def learning_hour_page():
         # Filter combined_df agar hanya berisi event yang ada di unique_events_df
         combined_df = combined_df[combined_df["Event"].isin(valid_events)].reset_index(drop=True)
 
-    quarter=["Q1", "Q2", "Q3", "Q4"]
-    quarter = st.pills("Pilih Quarter", quarter, selection_mode="single", default="Q1")
     combined_df = combined_df[combined_df["quarter"]==quarter]
 
-    # Mapping bobot berdasarkan kolom Variasi
-    bobot_map = {
-        "Coaching (Coach)/Mentoring (Mentor)": 1.5,
-        "Expert Insight (Pembicara)": 1.3,
-        "Teaching": 1.4,
-        "Learning Content Designer/Developer": 1.5,
-        "Publikasi Artikel/Video/Podcast": 1.1,
-        "Penguji/Assessor": 1.2
-    }
-
-    # 1️⃣ Tambahkan kolom bobot berdasarkan Variasi
-    combined_df["bobot"] = combined_df["variasi"].map(bobot_map)
-
-    # 2️⃣ Hitung kolom poin_lh
-    combined_df["poin_lh"] = combined_df["learningHour"] * combined_df["bobot"]
-
-    # 3️⃣ Hitung total poin tertinggi antar expert
-    total_poin_per_expert = combined_df.groupby("expert")["poin_lh"].sum().reset_index(name="total_poin")
-    poin_tertinggi = total_poin_per_expert["total_poin"].max()
-
-    # 4️⃣ Merge kembali ke combined_df
-    combined_df = combined_df.merge(total_poin_per_expert, on="expert", how="left")
-
-    # 5️⃣ Hitung skor normalisasi
-    combined_df["skor"] = (combined_df["total_poin"] / poin_tertinggi) * 100
+    # Poin (learningHour × bobot variasi) dan skor normalisasi: modules/quarterScores.py
+    combined_df, rekap_expert = learning_hour_scores(combined_df)
     a, b, c = st.columns(3)
     
     totalLH = combined_df["learningHour"].sum()
@@ -130,24 +101,6 @@ def learning_hour_page():
     # 6️⃣ Tampilkan hasil
     st.dataframe(combined_df[["nik","expert", "event", "variasi", "learningHour", "bobot", "poin_lh", "total_poin", "skor"]])
     
-    # === 🔹 Buat DataFrame Rekap per Expert ===
-    rekap_expert = (
-        combined_df.groupby(["nik","expert"], as_index=False)
-        .agg({"poin_lh": "sum", "learningHour":"sum"})
-        .rename(columns={"poin_lh": "total_poin"})
-    )
-
-    # Hitung total poin tertinggi
-    poin_tertinggi = rekap_expert["total_poin"].max()
-
-    # Hitung skor normalisasi (seperti di formula)
-    rekap_expert["skor"] = (rekap_expert["total_poin"] / poin_tertinggi) * 100
-    # rekap_expert = rekap_expert[rekap_expert["learningHour"]>=12].copy()
-    rekap_expert["nik"] = rekap_expert["nik"].apply(lambda x: int(x) if pd.notnull(x) else None)
-
-    # Urutkan dari skor tertinggi ke terendah
-    rekap_expert = rekap_expert.sort_values(by="skor", ascending=False).reset_index(drop=True)
-
     # === 🔹 Tampilkan hasil rekap ===
     st.subheader("📋 Rekap Total Poin & Skor per Expert")
     st.dataframe(rekap_expert, use_container_width=True)
@@ -176,16 +129,14 @@ def learning_hour_page():
                 }
                 upload_df.rename(columns=column_mapping, inplace=True)
 
-                # Convert ke list of dict
-                data_records = upload_df.to_dict(orient="records")
-
-                # Simpan ke tabel "calculated"
-                response = supabase.table("calculated").insert(data_records).execute()
-
-                if hasattr(response, "data") and response.data:
-                    st.success(f"✅ {len(data_records)} data berhasil disimpan ke tabel 'calculated' untuk {quarter}")
-                else:
-                    st.warning("⚠️ Tidak ada data yang disimpan atau respons kosong dari Supabase.")
+                # Satu run per simpan: menggantikan snapshot quarter ini secara atomik,
+                # jadi klik berulang tidak menambah baris dan nilai lama tidak tertinggal.
+                # Dijalankan di latar; status (jumlah baris, run id) tampil di sidebar.
+                submit_write(
+                    "calculated", ("learning_hour", quarter), lambda: replace_learning_hour_run(upload_df, quarter),
+                    label=f"Learning Hour {quarter}",
+                )
+                st.info(f"⏳ Penyimpanan Learning Hour {quarter} berjalan di latar; status tampil di sidebar.")
         except Exception as e:
             st.error(f"❌ Gagal menyimpan ke database: {e}")
 
@@ -1,37 +1,212 @@
+import numpy as np
 import streamlit as st
+from dbConfig import get_async_db_client
+from modules.asyncPostgrest import run_async
+from modules.bulkInsert import DEFAULT_CHUNK_SIZE, DEFAULT_WORKERS, describe_error, is_row_error, to_records, upload_chunks
+from modules.tableCache import invalidate_table
+from modules.uploadJournal import UploadJournal
 
-def uploadLim1(combined_df, DestinationTable, supabase, upload):
-            if upload == True:
-                try:
-                    df = combined_df[["id","Email","Event","Question","Answer","Expert","Unit","Quarter"]]
-
-                    # Upload baris demi baris ke tabel Supabase
-                    data = df.to_dict(orient="records")
-                    total_rows = len(data)
-
-                    if total_rows == 0:
-                        st.warning("⚠️ Tidak ada data untuk diupload.")
-                    else:
-                        st.info(f"⏳ Mengupload {total_rows} baris ke tabel '{DestinationTable}'...")
-                        progress_bar = st.progress(0)
-                        status_text = st.empty()
-
-                        # Upload satu per satu dengan progress bar
-                        for i, row in enumerate(data, start=1):
-                            try:
-                                supabase.table(DestinationTable).insert(row).execute()
-                            except Exception as e:
-                                st.error(f"❌ Gagal upload baris ke-{i}: {e}")
-                                continue
-
-                            progress = int(i / total_rows * 100)
-                            progress_bar.progress(progress)
-                            status_text.text(f"📤 Upload progress: {i}/{total_rows} baris ({progress}%)")
-
-                        progress_bar.empty()
-                        status_text.text("✅ Upload selesai.")
-                        st.success(f"Berhasil upload {total_rows} baris ke tabel '{DestinationTable}'")
-                        st.dataframe(df)
-
-                except Exception as e:
-                    st.error(f"❌ Gagal upload: {e}")
\ No newline at end of file
+async def _upload_pool(data, DestinationTable, journal, workers, progress_bar, status_text, keep=None):
+    """
+    Upload chunk yang belum ter-commit lewat pool worker; progress diperbarui
+    berurutan per chunk dan setiap chunk yang selesai dicatat di jurnal.
+    keep: mask baris yang dikirim (hasil dedupe); chunk jurnal tetap dihitung
+    dari seluruh baris sehingga batasnya tidak bergeser saat upload dilanjutkan.
+    """
+    total_rows = len(data)
+    total_chunks = -(-total_rows // journal.chunk_size)
+    skipped_rows = journal.committed_rows
+    skipped_chunks = journal.committed_chunks
+
+    def on_progress(chunks_done, rows_done):
+        done = skipped_rows + rows_done
+        progress = int(done / total_rows * 100)
+        progress_bar.progress(progress)
+        status_text.text(
+            f"📤 Upload progress: chunk {skipped_chunks + chunks_done}/{total_chunks}, {done}/{total_rows} baris ({progress}%)"
+        )
+
+    # Posisi asli baris yang dikirim per chunk (indeks error dari upload_chunks relatif ke baris terkirim)
+    sent = {}
+
+    def chunks():
+        for start, chunk in journal.pending(data):
+            positions = [i for i in range(start, start + len(chunk)) if keep is None or keep[i]]
+            if not positions:
+                journal.mark_committed(start, len(chunk))
+                continue
+            sent[start] = positions
+            yield start, [data[i] for i in positions]
+
+    def on_chunk_done(start, chunk, errors):
+        # Hanya chunk yang benar-benar diproses server yang dicatat (baris yang ditolak karena
+        # datanya disimpan terpisah); chunk yang gagal karena error lain dikirim lagi saat dilanjutkan
+        positions = sent.pop(start)
+        if all(is_row_error(e) for _, e in errors):
+            journal.mark_committed(
+                start, min(journal.chunk_size, len(data) - start),
+                failed=[(positions[i - start] - start, describe_error(e)) for i, e in errors],
+            )
+
+    async with get_async_db_client(workers) as db:
+        return await upload_chunks(
+            db, DestinationTable, chunks(), workers=workers,
+            on_progress=on_progress, on_chunk_done=on_chunk_done,
+        )
+
+def uploadTable(combined_df, DestinationTable, columns, chunk_size=DEFAULT_CHUNK_SIZE, workers=DEFAULT_WORKERS, dedupe=None):
+    """
+    Upload baris ke tabel tujuan lewat jalur bulk (chunk, pool worker, jurnal).
+    dedupe: fungsi(DataFrame baris yang belum ter-commit) → mask baris yang dikirim.
+    Dijalankan setelah chunk yang sudah ter-commit disaring, jadi jurnal tetap
+    dikunci pada isi upload sebelum dedupe (sama seperti jurnal per file).
+    Mengembalikan True jika semua baris sudah ada di database.
+    """
+    try:
+        df = combined_df[columns]
+
+        # Upload ke tabel Supabase per chunk (bulk insert, beberapa worker bersamaan).
+        # Tanpa kolom id: id dibuat oleh database sehingga aman diupload paralel.
+        # NaN/NA bukan JSON yang valid → dikirim sebagai null.
+        data = to_records(df)
+        total_rows = len(data)
+
+        if total_rows == 0:
+            st.warning("⚠️ Tidak ada data untuk diupload.")
+            return True
+
+        journal = UploadJournal.for_rows(DestinationTable, data, chunk_size)
+        # completed hanya True jika upload sebelumnya selesai tanpa baris gagal
+        if journal.completed:
+            st.info("ℹ️ Data yang sama sudah pernah diupload lengkap; tidak ada yang dikirim ulang.")
+            return True
+        if journal.committed_chunks:
+            st.info(
+                f"🔁 Melanjutkan upload sebelumnya: {journal.committed_chunks} chunk "
+                f"({journal.committed_rows} baris) sudah ter-commit dan dilewati."
+            )
+
+        keep = None
+        if dedupe is not None:
+            pending = [i for start, chunk in journal.pending(data) for i in range(start, start + len(chunk))]
+            keep = np.ones(total_rows, dtype=bool)
+            keep[pending] = dedupe(combined_df.iloc[pending])
+
+        st.info(f"⏳ Mengupload {total_rows} baris ke tabel '{DestinationTable}' (chunk {chunk_size} baris, {workers} worker)...")
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+
+        result = run_async(
+            _upload_pool(data, DestinationTable, journal, workers, progress_bar, status_text, keep)
+        )
+        if result["error"] is not None:
+            progress_bar.empty()
+            status_text.empty()
+            st.error(f"❌ Upload dihentikan: {describe_error(result['error'])}")
+            return False
+        # Termasuk baris yang ditolak pada upload sebelumnya (chunk-nya tidak dikirim ulang)
+        failed = journal.failed_rows
+        if journal.committed_rows == total_rows:
+            journal.finish()
+
+        progress_bar.empty()
+        invalidate_table(DestinationTable)
+        status_text.text("✅ Upload selesai.")
+        st.success(f"Berhasil upload {result['rows'] - len(result['failed'])} baris ke tabel '{DestinationTable}'")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Rows/sec", f"{result['rows_per_sec']:,.0f}")
+        col2.metric("Latensi p95 per chunk", f"{result['p95_latency'] * 1000:,.0f} ms")
+        col3.metric("Durasi", f"{result['seconds']:.1f} s")
+        if failed:
+            st.error(f"❌ {len(failed)} baris gagal diupload.")
+            failed_df = df.iloc[[i for i, _ in failed]].copy()
+            failed_df["error"] = [message for _, message in failed]
+            st.dataframe(failed_df)
+        st.dataframe(df)
+        return not failed and journal.completed
+
+    except Exception as e:
+        st.error(f"❌ Gagal upload: {e}")
+    return False
+
+async def _stream_pool(stream, workers, progress_bar, status_text):
+    """Upload potongan dari pipeline streaming; total baris belum diketahui di awal."""
+    total_files = len(stream.files)
+
+    def on_progress(chunks_done, rows_done):
+        # Perkiraan progress dari jumlah file yang sudah selesai dibaca
+        progress_bar.progress(int(stream.stats["files_done"] / total_files * 100))
+        status_text.text(
+            f"📤 Streaming upload: {stream.stats['read']} baris dibaca, "
+            f"{rows_done} baris terkirim ({chunks_done} chunk)"
+        )
+
+    async with get_async_db_client(workers) as db:
+        return await upload_chunks(
+            db, stream.table_name, stream.chunks(), workers=workers,
+            on_progress=on_progress, on_chunk_done=stream.on_chunk_done,
+        )
+
+def streamUploadTable(stream, workers=DEFAULT_WORKERS):
+    """
+    Upload file besar lewat pipeline streaming (baca → validasi → dedupe → insert
+    per potongan). Mengembalikan daftar (nama, sha256) file yang lengkap masuk.
+    """
+    try:
+        st.info(
+            f"⏳ Streaming {len(stream.files)} file ke tabel '{stream.table_name}' "
+            f"(potongan {stream.chunk_size} baris, {workers} worker)..."
+        )
+        progress_bar = st.progress(0)
+        status_text = st.empty()
+
+        result = run_async(_stream_pool(stream, workers, progress_bar, status_text))
+        if result["error"] is not None:
+            # Tidak ada file yang dicatat selesai; upload ulang melanjutkan dari jurnal
+            progress_bar.empty()
+            status_text.empty()
+            st.error(f"❌ Upload dihentikan: {describe_error(result['error'])}")
+            return []
+        complete = stream.finish()
+
+        progress_bar.empty()
+        invalidate_table(stream.table_name)
+        status_text.text("✅ Streaming upload selesai.")
+        stats = stream.stats
+        failed = len(result["failed"])
+        st.success(f"Berhasil upload {result['rows'] - failed} baris ke tabel '{stream.table_name}'")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Baris dibaca", f"{stats['read']:,}")
+        col2.metric("Ditolak validasi", f"{stats['rejected']:,}")
+        col3.metric("Duplikat", f"{stats['dup_batch'] + stats['dup_db']:,}")
+        col4.metric("Chunk dilewati (jurnal)", f"{stats['skipped_chunks']:,}")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Rows/sec", f"{result['rows_per_sec']:,.0f}")
+        col2.metric("Latensi p95 per chunk", f"{result['p95_latency'] * 1000:,.0f} ms")
+        col3.metric("Durasi", f"{result['seconds']:.1f} s")
+
+        rejected = stream.rejected_report()
+        if stats["rejected"]:
+            st.warning(f"⚠️ {stats['rejected']} baris ditolak validasi (menampilkan maks. {len(rejected)}).")
+            st.dataframe(rejected)
+            st.download_button(
+                "📥 Download baris ditolak (CSV)",
+                rejected.to_csv(index=False).encode("utf-8"),
+                file_name=f"{stream.table_name}_ditolak.csv",
+                mime="text/csv",
+            )
+        if failed:
+            st.error(f"❌ {failed} baris gagal diupload.")
+            st.dataframe(stream.failed_report())
+        if stats["failed_before"]:
+            st.error(
+                f"❌ {stats['failed_before']} baris ditolak server pada upload sebelumnya; "
+                "file tersebut belum dicatat selesai."
+            )
+        for name, error in stream.file_errors:
+            st.error(f"❌ Gagal membaca file {name}: {error}")
+        return complete
+
+    except Exception as e:
+        st.error(f"❌ Gagal upload: {e}")
+    return []
@@ -1,49 +1,27 @@
 import streamlit as st
 import pandas as pd
 import io
-from dbConfig import get_db_connection
-from google import genai
 from dataManager import load_all_data
+from modules.fileIngest import UPLOAD_TYPES, read_and_merge
+from modules.calculatedWriter import upsert_calculated
+from modules.quarterScores import variation_scores
+from modules.writeBehind import submit_write
 
 def newVariationPage():
-    supabase = get_db_connection()
-    def read_and_merge(files):
-        all_data = []
-        for uploaded_file in files:
-            try:
-                df = pd.read_excel(uploaded_file)
-            except Exception as e:
-                st.error(f"Gagal membaca file {uploaded_file.name}: {e}")
-                continue
-            # Ambil nama file tanpa ekstensi
-            file_name = uploaded_file.name.rsplit(".", 1)[0]
-            parts = file_name.split("_")
-            event, expert, unit,quarter = (parts + ["", "", "", ""])[:4]
-
-            # Tambahkan kolom metadata
-            df["Event"] = event
-            df["Expert"] = expert
-            df["Unit"] = unit
-            df["Quarter"] = quarter
-            all_data.append(df)
-
-        if all_data:
-            combined = pd.concat(all_data, ignore_index=True)
-            combined["Event"] = combined["Event"].fillna("").astype(str).str.strip()
-            return combined
-        else:
-            return pd.DataFrame()
-    
     st.title("Variation")  
     options = ["Upload file","From Data Base"]
     mode = st.pills("Data Resource", options, selection_mode="single", default="From Data Base")
+
+    # === Pilih Quarter terkini ===
+    quarter=["Q1", "Q2", "Q3", "Q4"]
+    quarter = st.pills("Pilih Quarter", quarter, selection_mode="single", default="Q1")
     if mode == "Upload file":   
         st.header("📊 Upload File")
 
         uploaded_files = st.file_uploader(
-            "Upload data (format Excel)", 
+            "Upload data (Excel, CSV/TSV, atau Parquet)", 
             accept_multiple_files=True, 
-            type=["xls", "xlsx"]
+            type=UPLOAD_TYPES
         )
         # Simpan hasil upload ke session_state agar tidak hilang setelah interaksi
         if uploaded_files:
@@ -52,7 +30,11 @@ def newVariationPage():
         combined_df = st.session_state.get("combined_df", pd.DataFrame())
     elif mode == "From Data Base":
         viewTable="learningHour_new"
-        combined_df = load_all_data(viewTable)
+        combined_df = load_all_data(
+            viewTable,
+            columns=["nik", "expert", "variasi", "quarter"],
+            filters={"quarter": quarter},
+        )
     if combined_df.empty:
         st.info("Tidak terdapat data")
     else:
@@ -72,64 +54,10 @@ def newVariationPage():
             """, unsafe_allow_html=True)
     st.empty
 
-    # === Pilih Quarter terkini ===
-    quarter=["Q1", "Q2", "Q3", "Q4"]
-    quarter = st.pills("Pilih Quarter", quarter, selection_mode="single", default="Q1")
     combined_df = combined_df[combined_df["quarter"]==quarter]
     
-    # Daftar variasi yang ingin direkap
-    target_variations = [
-        "Coaching (Coach)/Mentoring (Mentor)",
-        "Expert Insight (Pembicara)",
-        "Teaching",
-        "Learning Content Designer/Developer",
-        "Penguji/Assessor"
-    ]
-
-    # Hitung jumlah kemunculan setiap variasi untuk masing-masing expert
-    rekap_df = (
-        combined_df[combined_df["variasi"].isin(target_variations)]
-        .groupby(["nik","expert", "variasi"])
-        .size()
-        .unstack(fill_value=0)
-        .reset_index()
-    )
-
-    # Pastikan semua kolom variasi ada (jika ada yang tidak muncul di data)
-    for var in target_variations:
-        if var not in rekap_df.columns:
-            rekap_df[var] = 0
-
-    # Tambahkan kolom id urut dimulai dari 1
-    rekap_df.insert(0, "id", range(1, len(rekap_df) + 1))
-
-    # Urutkan kolom sesuai format yang diminta
-    rekap_df = rekap_df[
-        ["nik", "expert"]
-        + target_variations
-    ]
-
-
-    # Mapping bobot sesuai variasi
-    bobot_map = {
-        "Coaching (Coach)/Mentoring (Mentor)": 1.5,
-        "Expert Insight (Pembicara)": 1.3,
-        "Teaching": 1.4,
-        "Learning Content Designer/Developer": 1.5,
-        "Publikasi Artikel/Video/Podcast": 1.1,
-        "Penguji/Assessor": 1.2
-    }
-
-    # Hitung total poin berdasarkan jumlah × bobot
-    rekap_df["total_poin"] = sum(
-        rekap_df[col] * bobot_map.get(col, 0)
-        for col in target_variations
-    )
-
-    # Hitung skor normalisasi (poin_aktual / poin_tertinggi * 100)
-    max_poin = rekap_df["total_poin"].max()
-    rekap_df["skor"] = (rekap_df["total_poin"] / max_poin * 100).round(2)
-    rekap_df["nik"] = rekap_df["nik"].apply(lambda x: int(x) if pd.notnull(x) else None)
+    # Jumlah penugasan per variasi × bobot, lalu skor normalisasi: modules/quarterScores.py
+    rekap_df = variation_scores(combined_df)
 
     # Tampilkan hasil
     st.dataframe(rekap_df, use_container_width=True)
@@ -157,41 +85,13 @@ def newVariationPage():
                 }
                 upload_df.rename(columns=column_mapping, inplace=True)
 
-                # Ubah ke list of dict
-                data_records = upload_df.to_dict(orient="records")
-
-                updated_count = 0
-                inserted_count = 0
-
-                # Loop per baris agar bisa cek apakah data sudah ada
-                for row in data_records:
-                    expert_nik = row["nik"]
-                    quarter_value = row["quarter"]
-                    variation_value = row["variation"]
-
-                    # Cek apakah kombinasi expert + quarter sudah ada di tabel
-                    existing = (
-                        supabase.table("calculated")
-                        .select("id")
-                        .eq("nik", expert_nik)
-                        .eq("quarter", quarter_value)
-                        .execute()
-                    )
-
-                    if existing.data:
-                        # Jika sudah ada → update kolom variation
-                        supabase.table("calculated").update({"variation": variation_value}).eq(
-                            "nik", expert_nik
-                        ).eq("quarter", quarter_value).execute()
-                        updated_count += 1
-                    else:
-                        # # Jika belum ada → insert data baru
-                        # supabase.table("calculated").insert(row).execute()
-                        inserted_count += 1
-
-                st.success(
-                    f"✅ {inserted_count} data baru disimpan dan {updated_count} data diperbarui di tabel 'calculated' untuk {quarter}"
+                # Satu upsert bulk per quarter (kunci nik + quarter), dijalankan di latar;
+                # simpan ulang quarter yang sama sebelum selesai digabung jadi satu penulisan
+                submit_write(
+                    "calculated", ("variation", quarter), lambda: upsert_calculated(upload_df),
+                    label=f"Variation {quarter}",
                 )
+                st.info(f"⏳ Penyimpanan Variation {quarter} berjalan di latar; status tampil di sidebar.")
 
         except Exception as e:
             st.error(f"❌ Gagal menyimpan ke database: {e}")
@@ -2,37 +2,11 @@ import streamlit as st
 import pandas as pd
 import io
 from dbConfig import get_db_connection
-from google import genai
 from dataManager import load_all_data
+from modules.fileIngest import UPLOAD_TYPES, read_and_merge
 
 def performanceIndexPage():
     supabase = get_db_connection()
-    def read_and_merge(files):
-        all_data = []
-        for uploaded_file in files:
-            try:
-                df = pd.read_excel(uploaded_file)
-            except Exception as e:
-                st.error(f"Gagal membaca file {uploaded_file.name}: {e}")
-                continue
-            # Ambil nama file tanpa ekstensi
-            file_name = uploaded_file.name.rsplit(".", 1)[0]
-            parts = file_name.split("_")
-            event, expert, unit,quarter = (parts + ["", "", "", ""])[:4]
-
-            # Tambahkan kolom metadata
-            df["Event"] = event
-            df["Expert"] = expert
-            df["Unit"] = unit
-            df["Quarter"] = quarter
-            all_data.append(df)
-
-        if all_data:
-            combined = pd.concat(all_data, ignore_index=True)
-            combined["Event"] = combined["Event"].fillna("").astype(str).str.strip()
-            return combined
-        else:
-            return pd.DataFrame()
     
     st.title("Performance Index")  
     options = ["Upload file","From Data Base"]
@@ -41,9 +15,9 @@ def performanceIndexPage():
         st.header("📊 Upload File")
 
         uploaded_files = st.file_uploader(
-            "Upload data (format Excel)", 
+            "Upload data (Excel, CSV/TSV, atau Parquet)", 
             accept_multiple_files=True, 
-            type=["xls", "xlsx"]
+            type=UPLOAD_TYPES
         )
         # Simpan hasil upload ke session_state agar tidak hilang setelah interaksi
         if uploaded_files:
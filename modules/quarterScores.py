@@ -0,0 +1,125 @@
+import pandas as pd
+
+# Bobot per jenis variasi penugasan (dipakai Learning Hour dan Variation)
+BOBOT_MAP = {
+    "Coaching (Coach)/Mentoring (Mentor)": 1.5,
+    "Expert Insight (Pembicara)": 1.3,
+    "Teaching": 1.4,
+    "Learning Content Designer/Developer": 1.5,
+    "Publikasi Artikel/Video/Podcast": 1.1,
+    "Penguji/Assessor": 1.2,
+}
+
+# Variasi yang direkap untuk skor Variation
+TARGET_VARIATIONS = [
+    "Coaching (Coach)/Mentoring (Mentor)",
+    "Expert Insight (Pembicara)",
+    "Teaching",
+    "Learning Content Designer/Developer",
+    "Penguji/Assessor",
+]
+
+# Kolom skor di tabel calculated
+SCORE_COLUMNS = ["learning_hour", "LH", "variation", "expert_level"]
+
+
+def _nik_as_int(series):
+    return series.apply(lambda x: int(x) if pd.notnull(x) else None)
+
+
+def learning_hour_scores(df):
+    """
+    Poin Learning Hour (learningHour × bobot variasi) dari data learningHour_new satu quarter.
+    Mengembalikan (detail per baris, rekap per expert dengan total_poin, learningHour, skor).
+    """
+    detail = df.copy()
+    detail["bobot"] = detail["variasi"].map(BOBOT_MAP)
+    detail["poin_lh"] = detail["learningHour"] * detail["bobot"]
+
+    total_poin_per_expert = detail.groupby("expert")["poin_lh"].sum().reset_index(name="total_poin")
+    detail = detail.merge(total_poin_per_expert, on="expert", how="left")
+    detail["skor"] = (detail["total_poin"] / total_poin_per_expert["total_poin"].max()) * 100
+
+    rekap = (
+        detail.groupby(["nik", "expert"], as_index=False)
+        .agg({"poin_lh": "sum", "learningHour": "sum"})
+        .rename(columns={"poin_lh": "total_poin"})
+    )
+    rekap["skor"] = (rekap["total_poin"] / rekap["total_poin"].max()) * 100
+    rekap["nik"] = _nik_as_int(rekap["nik"])
+    rekap = rekap.sort_values(by="skor", ascending=False).reset_index(drop=True)
+    return detail, rekap
+
+
+def variation_scores(df):
+    """
+    Jumlah penugasan per variasi × bobot per expert, dari data learningHour_new satu quarter.
+    Mengembalikan rekap (nik, expert, kolom per variasi, total_poin, skor).
+    """
+    rekap = (
+        df[df["variasi"].isin(TARGET_VARIATIONS)]
+        .groupby(["nik", "expert", "variasi"])
+        .size()
+        .unstack(fill_value=0)
+        .reset_index()
+    )
+    # Pastikan semua kolom variasi ada (jika ada yang tidak muncul di data)
+    for var in TARGET_VARIATIONS:
+        if var not in rekap.columns:
+            rekap[var] = 0
+    rekap = rekap[["nik", "expert"] + TARGET_VARIATIONS].copy()
+
+    rekap["total_poin"] = sum(rekap[col] * BOBOT_MAP.get(col, 0) for col in TARGET_VARIATIONS)
+    rekap["skor"] = (rekap["total_poin"] / rekap["total_poin"].max() * 100).round(2)
+    rekap["nik"] = _nik_as_int(rekap["nik"])
+    return rekap
+
+
+def expert_level_scores(df, expert_df):
+    """
+    Poin Expert Level (profLevel × level expert dari tabel expert_level) per expert.
+    Mengembalikan (detail per baris, rekap per expert dengan poin_expert dan skor).
+    """
+    detail = df[["nik", "expert", "company", "event", "variasi", "profLevel"]].merge(
+        expert_df, how="left", left_on="expert", right_on="nama"
+    )
+    detail = detail.rename(columns={"level": "expert_level"}).drop(columns=["nama", "id"])
+    detail["poin"] = detail["profLevel"] * detail["expert_level"]
+    total_poin_per_expert = detail.groupby("expert")["poin"].sum().reset_index(name="total_poin")
+    detail = detail.merge(total_poin_per_expert, on="expert", how="left")
+
+    rekap = (
+        detail.groupby(["nik", "expert"], as_index=False)["poin"]
+        .sum()
+        .sort_values(by="poin", ascending=False)
+        .rename(columns={"poin": "poin_expert"})
+    )
+    rekap["skor"] = round((rekap["poin_expert"] / total_poin_per_expert["total_poin"].max()) * 100, 2)
+    rekap["nik"] = _nik_as_int(rekap["nik"])
+    return detail, rekap
+
+
+def quarter_score_rows(df, expert_df):
+    """
+    Semua komponen skor satu quarter dalam satu baris per expert (kolom tabel calculated):
+    nik, expert, learning_hour, LH, variation, expert_level. Komponen yang tidak
+    dimiliki expert di quarter ini bernilai NaN.
+    """
+    _, lh = learning_hour_scores(df)
+    variation = variation_scores(df)
+    _, level = expert_level_scores(df, expert_df)
+    frames = [
+        lh[["nik", "expert", "total_poin", "learningHour"]].rename(
+            columns={"total_poin": "learning_hour", "learningHour": "LH"}
+        ),
+        variation[["nik", "expert", "total_poin"]].rename(columns={"total_poin": "variation"}),
+        level[["nik", "expert", "poin_expert"]].rename(columns={"poin_expert": "expert_level"}),
+    ]
+    # Satu baris per nik; seperti simpan per halaman, baris terakhir yang dipakai jika nik ganda
+    frames = [f.dropna(subset=["nik"]).groupby("nik").last() for f in frames]
+    experts = pd.concat([f["expert"] for f in frames]).groupby(level=0).first()
+    rows = pd.concat([f.drop(columns="expert") for f in frames], axis=1)
+    rows.insert(0, "expert", experts)
+    rows = rows.rename_axis("nik").reset_index()
+    rows["nik"] = rows["nik"].astype("int64")
+    return rows[["nik", "expert"] + SCORE_COLUMNS]
@@ -2,48 +2,25 @@ import streamlit as st
 import pandas as pd
 import io
 from dbConfig import get_db_connection
-from google import genai
 from dataManager import load_all_data
+from modules.fileIngest import UPLOAD_TYPES, read_and_merge
 
 def satisfaction_page():
     supabase = get_db_connection()
-    def read_and_merge(files):
-        all_data = []
-        for uploaded_file in files:
-            try:
-                df = pd.read_excel(uploaded_file)
-            except Exception as e:
-                st.error(f"Gagal membaca file {uploaded_file.name}: {e}")
-                continue
-            # Ambil nama file tanpa ekstensi
-            file_name = uploaded_file.name.rsplit(".", 1)[0]
-            parts = file_name.split("_")
-            event, expert, unit,quarter = (parts + ["", "", "", ""])[:4]
-
-            # Tambahkan kolom metadata
-            df["Event"] = event
-            df["Expert"] = expert
-            df["Unit"] = unit
-            df["Quarter"] = quarter
-            all_data.append(df)
-
-        if all_data:
-            combined = pd.concat(all_data, ignore_index=True)
-            combined["Event"] = combined["Event"].fillna("").astype(str).str.strip()
-            return combined
-        else:
-            return pd.DataFrame()
     
     st.title("Learning Impact 1 (LIM 1)")  
     options = ["Upload file","From Data Base"]
     mode = st.pills("Data Resource", options, selection_mode="single", default="Upload file")
+    options = ["Q1", "Q2", "Q3", "Q4"]
+    default_selection = options
+    selectedQuarter = st.pills("Select Quarter", options, selection_mode="multi", default=default_selection)
     if mode == "Upload file":   
         st.header("Upload File")
 
         uploaded_files = st.file_uploader(
-            "Upload data (format Excel)", 
+            "Upload data (Excel, CSV/TSV, atau Parquet)", 
             accept_multiple_files=True, 
-            type=["xls", "xlsx"]
+            type=UPLOAD_TYPES
         )
         # Simpan hasil upload ke session_state agar tidak hilang setelah interaksi
         if uploaded_files:
@@ -52,14 +29,29 @@ def satisfaction_page():
         combined_df = st.session_state.get("combined_df", pd.DataFrame())
     elif mode == "From Data Base":
         viewTable="learningImpact1"
-        combined_df = load_all_data(viewTable)
+
+        # Preview sementara selama data masih diambil per batch
+        preview = st.empty()
+        answers_per_quarter = {}
+        def render_partial(chunk, total_rows):
+            for q, n in chunk["Quarter"].value_counts().items():
+                answers_per_quarter[q] = answers_per_quarter.get(q, 0) + n
+            with preview.container():
+                st.caption(f"⏳ {total_rows} baris dimuat, data masih diambil...")
+                st.bar_chart(pd.Series(answers_per_quarter, name="Jumlah Jawaban"))
+                st.dataframe(chunk.tail(10), use_container_width=True)
+
+        combined_df = load_all_data(
+            viewTable,
+            incremental=True,
+            columns=["Email", "Event", "Question", "Answer", "Expert", "Unit", "Quarter"],
+            filters={"Quarter": selectedQuarter},
+            on_chunk=render_partial,
+        )
+        preview.empty()
     if combined_df.empty:
         st.info("Tidak terdapat data")
     else:
-        options = ["Q1", "Q2", "Q3", "Q4"]
-        default_selection = options
-        selectedQuarter = st.pills("Select Quarter", options, selection_mode="multi", default=default_selection)
-        
         combined_df = combined_df[combined_df["Quarter"].isin(selectedQuarter)]
         # st.success(f"✅ Data berhasil digabungkan ({len(combined_df)} baris total)")
         st.dataframe(combined_df)
@@ -142,7 +134,7 @@ def satisfaction_page():
 
                     # --- Table 2: Rata-rata per Pertanyaan (semua expert digabung) ---
                     if not numeric_df.empty:
-                        rekap_question = numeric_df.groupby(qtext_col, as_index=False)[answer_col].mean()
+                        rekap_question = numeric_df.groupby(qtext_col, as_index=False, observed=True)[answer_col].mean()
                         rekap_question["NILAI ALL"] = rekap_question[answer_col] * 10
                         rekap_question = rekap_question.rename(columns={qtext_col: "PERTANYAAN UBPP STRUKTUR"})[
                             ["PERTANYAAN UBPP STRUKTUR", "NILAI ALL"]
@@ -186,7 +178,7 @@ def satisfaction_page():
 
                         # Hitung rata-rata nilai per pertanyaan
                         avg_per_question = (
-                            numeric_df.groupby("Question")["Answer_Numeric"]
+                            numeric_df.groupby("Question", observed=True)["Answer_Numeric"]
                             .mean()
                             .reset_index()
                             .rename(columns={"Answer_Numeric": "Average_Score"})
@@ -243,7 +235,7 @@ def satisfaction_page():
                 resume_df["is_numeric"] = pd.to_numeric(resume_df["Answer_Clean"], errors="coerce").notna()
                 resume_df["Answer_Numeric"] = pd.to_numeric(resume_df["Answer_Clean"], errors="coerce")
                 grafik_df = combined_df[["Event", "Unit"]].copy()
-                event_count = grafik_df.groupby("Unit")["Event"].nunique().reset_index()
+                event_count = grafik_df.groupby("Unit", observed=True)["Event"].nunique().reset_index()
                 event_count.columns = ["unit", "jumlah_event"]
                 st.markdown(
                     """
@@ -254,7 +246,7 @@ def satisfaction_page():
                 colA1, colA2 = st.columns(2)
                 with colA1:
                 # --- Grafik 1: Jumlah Pelatihan per Unit ---
-                    unit_count = resume_df.groupby("Unit", as_index=False)["Event"].nunique()
+                    unit_count = resume_df.groupby("Unit", as_index=False, observed=True)["Event"].nunique()
                     unit_count = unit_count.rename(columns={"Event": "Jumlah Pelatihan"})
 
                     st.bar_chart(event_count.set_index("unit")["jumlah_event"])
@@ -270,7 +262,7 @@ def satisfaction_page():
                     if resume_df["is_numeric"].any():
                         table1 = (
                             resume_df[resume_df["is_numeric"]]
-                            .groupby(["Event", "Unit"], as_index=False)["Answer_Numeric"]
+                            .groupby(["Event", "Unit"], as_index=False, observed=True)["Answer_Numeric"]
                             .mean()
                         )
                         table1["NILAI AVERAGE"] = table1["Answer_Numeric"] * 10
@@ -291,7 +283,7 @@ def satisfaction_page():
                     if resume_df["is_numeric"].any():
                         table2 = (
                             resume_df[resume_df["is_numeric"]]
-                            .groupby("Question", as_index=False)["Answer_Numeric"]
+                            .groupby("Question", as_index=False, observed=True)["Answer_Numeric"]
                             .mean()
                         )
                         table2["NILAI AVERAGE PERTANYAAN"] = table2["Answer_Numeric"] * 10
@@ -372,7 +364,8 @@ def satisfaction_page():
                         # Simpan dulu ke session_state agar bisa diakses nanti
                         st.session_state["nilai_pertanyaan_list"] = nilai_pertanyaan_list
                         st.success("✅ Data berhasil disiapkan untuk dikirim ke Gemini API.")
-                    # konfigurasi
+                    # konfigurasi (SDK Gemini baru diimpor saat tombol dipakai)
+                    from google import genai
                     client = genai.Client(api_key=st.secrets["GEMINI_API_KEY"])
 
                     if "nilai_pertanyaan_list" in st.session_state:
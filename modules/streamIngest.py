@@ -0,0 +1,203 @@
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+from modules.bulkInsert import describe_error, is_row_error, to_records
+from modules.fileIngest import iter_file_chunks
+from modules.ingestLedger import dedupable_rows, row_hashes
+from modules.uploadDestinations import apply_fallback
+from modules.uploadJournal import UploadJournal, frame_hash
+from modules.uploadValidation import validate
+
+# Batas baris yang disimpan untuk laporan (jumlahnya tetap dihitung semua)
+MAX_REPORT_ROWS = 5000
+
+# Batas memori state dedupe: jumlah hash baris upload yang diingat (8 byte per hash;
+# duplikat yang berjarak lebih jauh dari ini tidak lagi terdeteksi di dalam upload)
+# dan jumlah kombinasi filter yang hash barisnya di tabel disimpan (LRU, dimuat ulang bila perlu)
+MAX_SEEN_HASHES = 2_000_000
+MAX_EXISTING_FILTERS = 8
+
+
+class StreamIngest:
+    """
+    Pipeline upload streaming: tiap file dibaca per potongan baris, dinormalisasi,
+    divalidasi, dibuang duplikatnya, lalu diserahkan ke pool upload dan dilepas
+    dari memori. Memori puncak bergantung pada ukuran potongan, bukan total baris.
+
+    files          → [(nama, bytes atau objek file, sha256)]; objek file dibaca langsung
+    existing_rows  → fungsi(filters) → DataFrame kolom row_key yang sudah ada di tabel
+                     (dipanggil dari thread pipeline, jadi tidak boleh memakai elemen Streamlit)
+
+    Pakai `chunks()` sebagai sumber upload_chunks dan `on_chunk_done` sebagai callback-nya.
+    File yang gagal dibaca dicatat di `file_errors` dan file berikutnya tetap diproses.
+    """
+
+    def __init__(self, files, destination, chunk_size, existing_rows):
+        self.files = files
+        self.destination = destination
+        self.table_name = destination["table"]
+        self.chunk_size = chunk_size
+        self.existing_rows = existing_rows
+        self.stats = {"read": 0, "rejected": 0, "dup_batch": 0, "dup_db": 0, "queued": 0, "skipped_chunks": 0, "files_done": 0, "files_failed": 0, "failed_before": 0}
+        self.rejected = []
+        self.failed = []
+        self.file_errors = []
+        self._journals = {}
+        self._pending = {}
+        self._seen = deque()
+        self._seen_count = 0
+        self._existing = OrderedDict()
+        self._incomplete = set()
+        self._read_done = set()
+        self._lock = threading.Lock()
+
+    def _report(self, bucket, df):
+        kept = sum(len(d) for d in bucket)
+        if kept < MAX_REPORT_ROWS and not df.empty:
+            bucket.append(df.head(MAX_REPORT_ROWS - kept))
+
+    def _existing_hashes(self, df):
+        """Hash baris yang sudah ada di tabel, untuk nilai filter potongan ini (di-cache)."""
+        filters = {col: sorted(df[col].dropna().unique()) for col in self.destination["dedupe_filters"]}
+        key = tuple((col, tuple(values)) for col, values in filters.items())
+        if key in self._existing:
+            self._existing.move_to_end(key)
+            return self._existing[key]
+        existing = self.existing_rows(filters)
+        hashes = row_hashes(existing, self.destination["row_key"]).to_numpy() if not existing.empty else []
+        self._existing[key] = np.unique(np.asarray(hashes, dtype=np.uint64))
+        while len(self._existing) > MAX_EXISTING_FILTERS:
+            self._existing.popitem(last=False)
+        return self._existing[key]
+
+    def _remember(self, hashes):
+        """Simpan hash baris yang dikirim; yang paling lama dibuang jika melewati MAX_SEEN_HASHES."""
+        if len(hashes):
+            self._seen.append(np.asarray(hashes, dtype=np.uint64))
+            self._seen_count += len(hashes)
+        while self._seen_count > MAX_SEEN_HASHES and len(self._seen) > 1:
+            self._seen_count -= len(self._seen.popleft())
+
+    def _seen_before(self, hashes):
+        seen = np.zeros(len(hashes), dtype=bool)
+        for block in self._seen:
+            seen |= np.isin(hashes, block)
+        return seen
+
+    def _dedupe(self, df):
+        if df.empty:
+            return df
+        key = self.destination["row_key"]
+        hashes = row_hashes(df, key)
+        dedupable = dedupable_rows(df, key)
+        values = hashes.to_numpy()
+        in_batch = (hashes.duplicated().to_numpy() | self._seen_before(values)) & dedupable.to_numpy()
+        in_db = np.isin(values, self._existing_hashes(df)) & dedupable.to_numpy() & ~in_batch
+        keep = ~(in_batch | in_db)
+        self.stats["dup_batch"] += int(in_batch.sum())
+        self.stats["dup_db"] += int(in_db.sum())
+        self._remember(values[keep & dedupable.to_numpy()])
+        return df[keep]
+
+    def _frames(self, name, content, digest):
+        """Potongan satu file; error parsing dicatat per file dan file berikutnya tetap diproses."""
+        frames = iter_file_chunks(
+            name, content, self.destination["column_mapping"], self.destination["dtypes"], self.chunk_size
+        )
+        while True:
+            try:
+                frame = next(frames)
+            except StopIteration:
+                return
+            except Exception as e:
+                # Potongan sebelum error tetap tercatat di jurnal; upload ulang melanjutkan dari sana
+                self.file_errors.append((name, describe_error(e)))
+                self.stats["files_failed"] += 1
+                self._incomplete.add(digest)
+                return
+            yield frame
+
+    def chunks(self):
+        """Generator (offset, baris) siap-kirim; potongan yang sudah ter-commit dilewati."""
+        offset = 0
+        for name, content, digest in self.files:
+            journal = UploadJournal.for_file(self.table_name, digest, self.chunk_size)
+            self._journals[digest] = (name, journal)
+            if journal.completed:
+                self.stats["files_done"] += 1
+                continue
+
+            raw_start = 0
+            for frame in self._frames(name, content, digest):
+                size = len(frame)
+                raw_hash = frame_hash(frame)
+                self.stats["read"] += size
+                if journal.is_committed(raw_start, raw_hash):
+                    self.stats["skipped_chunks"] += 1
+                    raw_start += size
+                    continue
+
+                clean, rejected = validate(apply_fallback(frame, self.destination), self.table_name)
+                self.stats["rejected"] += len(rejected)
+                self._report(self.rejected, rejected)
+                rows = to_records(self._dedupe(clean)[self.destination["columns"]])
+                del frame, clean
+
+                if not rows:
+                    journal.mark_committed(raw_start, size, raw_hash, rejected=len(rejected))
+                else:
+                    with self._lock:
+                        self._pending[offset] = (digest, raw_start, size, raw_hash, len(rejected))
+                    self.stats["queued"] += len(rows)
+                    yield offset, rows
+                    offset += len(rows)
+                raw_start += size
+            if digest not in self._incomplete:
+                self._read_done.add(digest)
+                self.stats["files_done"] += 1
+
+    def on_chunk_done(self, start, rows, errors):
+        with self._lock:
+            digest, raw_start, size, raw_hash, rejected = self._pending.pop(start)
+        if errors:
+            self._incomplete.add(digest)
+            failed = pd.DataFrame([rows[i - start] for i, _ in errors])
+            failed["error"] = [describe_error(e) for _, e in errors]
+            self._report(self.failed, failed)
+        # Hanya potongan yang benar-benar diproses server yang dicatat (baris yang ditolak karena
+        # datanya disimpan terpisah); yang gagal karena error lain dikirim lagi saat upload diulang
+        if all(is_row_error(e) for _, e in errors):
+            self._journals[digest][1].mark_committed(
+                raw_start, size, raw_hash, rejected=rejected,
+                failed=[(i - start, describe_error(e)) for i, e in errors],
+            )
+
+    def finish(self):
+        """
+        Tandai jurnal file yang semua potongannya selesai. Mengembalikan
+        [(nama, sha256)] file yang barisnya lengkap masuk (untuk ledger).
+        File dengan potongan yang belum terkirim atau baris yang ditolak server
+        (juga dari upload sebelumnya) tidak ikut.
+        """
+        complete = []
+        unsent = {digest for digest, *_ in self._pending.values()}
+        for digest, (name, journal) in self._journals.items():
+            if journal.completed:
+                complete.append((name, digest))
+                continue
+            if digest in self._incomplete or digest in unsent or digest not in self._read_done:
+                continue
+            if journal.finish():
+                complete.append((name, digest))
+            else:
+                self.stats["failed_before"] += len(journal.failed_rows)
+        return complete
+
+    def rejected_report(self):
+        return pd.concat(self.rejected, ignore_index=True) if self.rejected else pd.DataFrame()
+
+    def failed_report(self):
+        return pd.concat(self.failed, ignore_index=True) if self.failed else pd.DataFrame()
@@ -0,0 +1,73 @@
+import threading
+
+from cachetools import TTLCache
+
+from modules import diskCache
+from modules.tableSync import on_table_write
+
+# Umur maksimum satu entri cache (detik) dan batas total memori seluruh entri
+DEFAULT_TTL = 600
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def _frame_size(df):
+    """Ukuran DataFrame di memori (byte), dipakai sebagai bobot LRU."""
+    return max(1, int(df.memory_usage(index=True, deep=True).sum()))
+
+
+class TableCache:
+    """
+    Cache proses-wide untuk hasil load tabel Supabase.
+    Entri kadaluarsa setelah `ttl` detik, dan jika total ukuran melebihi
+    `max_bytes`, entri yang paling lama tidak dipakai dibuang lebih dulu.
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES):
+        self._lock = threading.RLock()
+        self._entries = TTLCache(maxsize=max_bytes, ttl=ttl, getsizeof=_frame_size)
+
+    def get(self, table_name, query_key=()):
+        """Ambil salinan DataFrame dari cache, atau None jika tidak ada / kadaluarsa."""
+        with self._lock:
+            df = self._entries.get((table_name, query_key))
+        # Salinan agar perubahan di halaman tidak mengotori isi cache
+        return None if df is None else df.copy()
+
+    def put(self, table_name, query_key, df):
+        with self._lock:
+            try:
+                self._entries[(table_name, query_key)] = df.copy()
+            except ValueError:
+                # DataFrame lebih besar dari kapasitas cache → tidak disimpan
+                pass
+
+    def invalidate(self, table_name):
+        """Hapus semua entri milik satu tabel (dipanggil setelah ada penulisan)."""
+        with self._lock:
+            for key in [k for k in list(self._entries.keys()) if k[0] == table_name]:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Ringkasan isi cache: jumlah entri dan total byte."""
+        with self._lock:
+            self._entries.expire()
+            return {
+                "entries": len(self._entries),
+                "bytes": int(self._entries.currsize),
+                "max_bytes": int(self._entries.maxsize),
+            }
+
+
+# Satu instance per proses Streamlit, dipakai bersama oleh semua sesi/halaman
+table_cache = TableCache()
+
+
+def invalidate_table(table_name):
+    table_cache.invalidate(table_name)
+    diskCache.invalidate(table_name)
+    # Snapshot delta yang tidak bisa melacak perubahan ikut dibuang
+    on_table_write(table_name)
@@ -0,0 +1,253 @@
+import threading
+
+import pandas as pd
+
+from modules import diskCache
+
+# Kolom penanda perubahan dan tabel tombstone (lihat sql/001_sync_tracking.sql)
+UPDATED_AT_COLUMN = "updated_at"
+TOMBSTONE_TABLE = "deleted_rows"
+
+# Tombstone diambil sedikit mundur dari watermark agar transaksi yang commit
+# terlambat tidak terlewat; id yang terambil dua kali cukup diabaikan.
+# Baris berubah tidak memakai overlap: posisinya dilacak dengan keyset
+# (updated_at, id) sehingga baris yang sama tidak diunduh ulang tiap sinkronisasi.
+WATERMARK_OVERLAP = pd.Timedelta(seconds=30)
+
+
+class TableSnapshot:
+    """Salinan lokal satu tabel beserta posisi sinkronisasi terakhirnya."""
+
+    def __init__(self, df):
+        self.df = df
+        self.last_id = int(df["id"].max()) if not df.empty else 0
+        self.change_tracking = UPDATED_AT_COLUMN in df.columns
+        self.updated_watermark, self.updated_watermark_id = _updated_cursor(df)
+        self.deleted_watermark = None
+        self.tombstones = True
+        self.lock = threading.Lock()
+
+
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def _persist(table_name, snap):
+    """Simpan snapshot + posisi sinkronisasi ke disk agar bisa dipakai setelah restart."""
+    diskCache.put(table_name, diskCache.SNAPSHOT_KEY, snap.df, meta={
+        "last_id": int(snap.last_id),
+        "updated_watermark": None if snap.updated_watermark is None else str(snap.updated_watermark),
+        "updated_watermark_id": snap.updated_watermark_id,
+        "deleted_watermark": None if snap.deleted_watermark is None else str(snap.deleted_watermark),
+        "tombstones": snap.tombstones,
+    })
+
+
+def _restore(table_name):
+    """Muat snapshot dari disk (tanpa TTL; kesegarannya dijaga oleh delta sync)."""
+    cached = diskCache.get(table_name, diskCache.SNAPSHOT_KEY, ttl=None)
+    if cached is None:
+        return None
+    df, meta = cached
+    snap = TableSnapshot(df)
+    snap.last_id = meta.get("last_id", snap.last_id)
+    for attr in ["updated_watermark", "deleted_watermark"]:
+        if meta.get(attr):
+            setattr(snap, attr, pd.Timestamp(meta[attr]))
+    if meta.get("updated_watermark_id") is not None:
+        snap.updated_watermark_id = meta["updated_watermark_id"]
+    snap.tombstones = meta.get("tombstones", True)
+    return snap
+
+
+def _max_timestamp(df, column):
+    if column not in df.columns or df.empty:
+        return None
+    return pd.to_datetime(df[column], utc=True, errors="coerce").max()
+
+
+def _updated_cursor(df):
+    """Posisi keyset (updated_at, id) terakhir di DataFrame; (None, 0) jika tidak ada."""
+    if UPDATED_AT_COLUMN not in df.columns or df.empty:
+        return None, 0
+    updated = pd.to_datetime(df[UPDATED_AT_COLUMN], utc=True, errors="coerce")
+    latest = updated.max()
+    if pd.isna(latest):
+        return None, 0
+    return latest, int(df.loc[updated == latest, "id"].max())
+
+
+def _since(watermark):
+    return (watermark - WATERMARK_OVERLAP).isoformat()
+
+
+def _fetch_keyset(query_factory, batch_size):
+    """Keyset pagination generik berdasarkan id untuk query delta."""
+    rows = []
+    last_id = None
+    while True:
+        query = query_factory().order("id", desc=False).limit(batch_size)
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        data = query.execute().data
+        if not data:
+            break
+        rows.extend(data)
+        last_id = data[-1]["id"]
+        if len(data) < batch_size:
+            break
+    return rows
+
+
+def _fetch_delta(supabase, table_name, snap, batch_size):
+    """
+    Baris baru (id > last_id) dan baris yang berubah setelah posisi (updated_at, id)
+    terakhir, dalam satu query. Tanpa perubahan baru hasilnya kosong.
+    """
+    if snap.change_tracking and snap.updated_watermark is not None and not pd.isna(snap.updated_watermark):
+        watermark = snap.updated_watermark.isoformat()
+        condition = (
+            f'id.gt.{snap.last_id},{UPDATED_AT_COLUMN}.gt."{watermark}",'
+            f'and({UPDATED_AT_COLUMN}.eq."{watermark}",id.gt.{snap.updated_watermark_id})'
+        )
+        factory = lambda: supabase.table(table_name).select("*").or_(condition)
+    else:
+        factory = lambda: supabase.table(table_name).select("*").gt("id", snap.last_id)
+    return _fetch_keyset(factory, batch_size)
+
+
+def _fetch_tombstones(supabase, table_name, snap, batch_size):
+    """
+    Id baris yang dihapus sejak sinkronisasi terakhir (kosong jika tabel tombstone tidak ada).
+    Diambil per halaman dengan keyset (deleted_at, id) agar tidak terpotong batas baris
+    PostgREST; watermark baru dimajukan setelah halaman terakhir.
+    """
+    if not snap.tombstones:
+        return []
+    rows = []
+    cursor = None
+    while True:
+        query = supabase.table(TOMBSTONE_TABLE).select("id,row_id,deleted_at").eq("table_name", table_name)
+        if snap.deleted_watermark is not None:
+            query = query.gt("deleted_at", _since(snap.deleted_watermark))
+        if cursor is not None:
+            deleted_at, last_id = cursor
+            query = query.or_(f'deleted_at.gt."{deleted_at}",and(deleted_at.eq."{deleted_at}",id.gt.{last_id})')
+        query = query.order("deleted_at", desc=False).order("id", desc=False).limit(batch_size)
+        try:
+            data = query.execute().data
+        except Exception:
+            if cursor is not None:
+                raise
+            # Skema belum dimigrasi → hapus tidak bisa dilacak untuk tabel ini
+            snap.tombstones = False
+            return []
+        rows.extend(data)
+        if len(data) < batch_size:
+            break
+        cursor = (data[-1]["deleted_at"], data[-1]["id"])
+    if rows:
+        snap.deleted_watermark = _max_timestamp(pd.DataFrame(rows), "deleted_at")
+    return [row["row_id"] for row in rows]
+
+
+def _merge(snap, delta_rows, deleted_ids):
+    """Gabungkan delta ke snapshot: timpa baris yang berubah, tambah yang baru, buang yang dihapus."""
+    if "id" not in snap.df.columns:
+        # Snapshot dari tabel yang kosong saat dimuat penuh: belum punya kolom sama sekali
+        if not delta_rows:
+            return
+        snap.df = pd.DataFrame(delta_rows).sort_values("id").reset_index(drop=True)
+        snap.change_tracking = UPDATED_AT_COLUMN in snap.df.columns
+        snap.last_id = int(snap.df["id"].max())
+        snap.updated_watermark, snap.updated_watermark_id = _updated_cursor(snap.df)
+        deleted = snap.df["id"].isin(deleted_ids)
+        if deleted.any():
+            snap.df = snap.df[~deleted].reset_index(drop=True)
+        return
+    base = snap.df.set_index("id", drop=False)
+    if deleted_ids:
+        base = base.drop(index=deleted_ids, errors="ignore")
+    if delta_rows:
+        delta = pd.DataFrame(delta_rows).set_index("id", drop=False)
+        existing = delta.index.intersection(base.index)
+        if len(existing):
+            cols = [c for c in delta.columns if c in base.columns]
+            base.loc[existing, cols] = delta.loc[existing, cols]
+        fresh = delta.loc[delta.index.difference(base.index)]
+        if not fresh.empty:
+            base = pd.concat([base, fresh])
+        snap.last_id = max(snap.last_id, int(delta["id"].max()))
+        wm, wm_id = _updated_cursor(delta)
+        if wm is not None and (snap.updated_watermark is None or (wm, wm_id) > (snap.updated_watermark, snap.updated_watermark_id)):
+            snap.updated_watermark, snap.updated_watermark_id = wm, wm_id
+    snap.df = base.sort_index().reset_index(drop=True)
+
+
+def get_snapshot(table_name):
+    """Snapshot tabel di memori, atau dipulihkan dari disk; None jika belum pernah dimuat."""
+    with _snapshots_lock:
+        snap = _snapshots.get(table_name)
+    if snap is None:
+        snap = _restore(table_name)
+        if snap is not None:
+            with _snapshots_lock:
+                snap = _snapshots.setdefault(table_name, snap)
+    return snap
+
+
+def sync_table(supabase, table_name, full_loader, batch_size=1000):
+    """
+    Kembalikan snapshot lokal tabel yang sudah disinkronkan.
+    Pertama kali: full_loader() dipanggil untuk memuat seluruh tabel.
+    Berikutnya: hanya delta (baris baru, berubah, dan tombstone) yang diambil.
+    Mengembalikan (DataFrame, ringkasan) dengan ringkasan berisi jumlah
+    baris baru/berubah/dihapus pada sinkronisasi ini.
+    """
+    snap = get_snapshot(table_name)
+    if snap is None:
+        df = pd.DataFrame(full_loader())
+        if "id" in df.columns:
+            df = df.sort_values("id").reset_index(drop=True)
+        snap = TableSnapshot(df)
+        # Tombstone lama tidak relevan untuk snapshot yang baru dimuat penuh
+        snap.deleted_watermark = pd.Timestamp.now(tz="UTC")
+        with _snapshots_lock:
+            _snapshots[table_name] = snap
+        _persist(table_name, snap)
+        return snap.df.copy(), {"full": True, "rows": len(snap.df)}
+
+    with snap.lock:
+        previous_ids = set(snap.df["id"]) if not snap.df.empty else set()
+        delta_rows = _fetch_delta(supabase, table_name, snap, batch_size)
+        deleted_ids = _fetch_tombstones(supabase, table_name, snap, batch_size)
+        _merge(snap, delta_rows, deleted_ids)
+        if delta_rows or deleted_ids:
+            _persist(table_name, snap)
+        summary = {
+            "full": False,
+            "rows": len(snap.df),
+            "new": sum(1 for r in delta_rows if r["id"] not in previous_ids),
+            "changed": sum(1 for r in delta_rows if r["id"] in previous_ids),
+            "deleted": len(set(deleted_ids) & previous_ids),
+        }
+        return snap.df.copy(), summary
+
+
+def on_table_write(table_name):
+    """
+    Dipanggil setelah aplikasi menulis ke tabel. Snapshot tabel tanpa kolom
+    updated_at tidak bisa melihat perubahan baris lama, jadi dibuang agar
+    dimuat ulang penuh pada load berikutnya.
+    """
+    with _snapshots_lock:
+        snap = _snapshots.get(table_name)
+        if snap is not None and (not snap.change_tracking or not snap.tombstones):
+            _snapshots.pop(table_name, None)
+            diskCache.invalidate(table_name, keep_snapshot=False)
+
+
+def drop_snapshot(table_name):
+    with _snapshots_lock:
+        _snapshots.pop(table_name, None)
+    diskCache.invalidate(table_name, keep_snapshot=False)
@@ -0,0 +1,120 @@
+from modules.dtypePlan import ARROW_STRING
+from modules.ingestLedger import ROW_KEY
+
+# Destinasi upload Data Manager. Per destinasi:
+#   table          → tabel Supabase tujuan
+#   column_mapping → nama kolom file (lowercase, tanpa spasi di tepi) → kolom tabel
+#   dtypes         → dtype teks yang diterapkan saat file dibaca; kolom angka dibiarkan
+#                    apa adanya agar nilai yang salah tetap terlihat di laporan validasi
+#   columns        → kolom yang dikirim ke tabel (id dibuat oleh database)
+#   row_key        → kolom penentu baris unik (dedupe dalam batch dan terhadap tabel);
+#                    tabel tanpa kolom sesi memakai seluruh kolom (hanya duplikat persis)
+#   dedupe_filters → kolom untuk mempersempit query baris yang sudah ada; semua nilai
+#                    batch masuk satu filter in.(...) di URL, jadi hanya kolom dengan
+#                    sedikit nilai (Event LIM1 berasal dari nama file, satu per file).
+#                    Learning Hours/Variation cukup per quarter: satu export bisa
+#                    berisi ratusan nama course
+#   fallback       → kolom tabel yang diisi dari metadata nama file jika kosong
+# Aturan validasi tiap tabel ada di modules/uploadValidation.SCHEMAS.
+DESTINATIONS = {
+    "Learning Impact 1": {
+        "table": "learningImpact1",
+        "column_mapping": {
+            "email": "Email",
+            "email address": "Email",
+            "question": "Question",
+            "cleaned_question": "Question",
+            "soal": "Question",
+            "answer": "Answer",
+            "cleaned_answer": "Answer",
+            "response": "Answer",
+        },
+        "dtypes": {"Email": ARROW_STRING, "Question": ARROW_STRING, "Answer": ARROW_STRING},
+        "columns": ["Email", "Event", "Question", "Answer", "Expert", "Unit", "Quarter"],
+        "row_key": ROW_KEY,
+        "dedupe_filters": ["Quarter", "Event"],
+        "fallback": {},
+    },
+    "Learning Hours": {
+        "table": "learningHour_new",
+        "column_mapping": {
+            "nik": "nik",
+            "nik expert": "nik",
+            "expert": "expert",
+            "name": "expert",
+            "nama": "expert",
+            "nama expert": "expert",
+            "event": "event",
+            "course_name": "event",
+            "course name": "event",
+            "course": "event",
+            "variasi": "variasi",
+            "variation": "variasi",
+            "learninghour": "learningHour",
+            "learning hour": "learningHour",
+            "learning_hour": "learningHour",
+            "jp": "learningHour",
+            "proflevel": "profLevel",
+            "prof level": "profLevel",
+            "proficiency level": "profLevel",
+            "company": "company",
+            "perusahaan": "company",
+            "quarter": "quarter",
+        },
+        "dtypes": {
+            "expert": ARROW_STRING,
+            "event": ARROW_STRING,
+            "variasi": ARROW_STRING,
+            "company": ARROW_STRING,
+            "quarter": ARROW_STRING,
+        },
+        "columns": ["nik", "expert", "event", "variasi", "learningHour", "profLevel", "company", "quarter"],
+        # Tanpa kolom sesi/tanggal: hanya baris yang sama persis yang dianggap duplikat,
+        # agar sesi kedua dari variasi yang sama di event yang sama tetap terhitung
+        "row_key": ["nik", "expert", "event", "variasi", "learningHour", "profLevel", "company", "quarter"],
+        "dedupe_filters": ["quarter"],
+        "fallback": {"quarter": "Quarter"},
+    },
+    "Variation": {
+        "table": "variation",
+        "column_mapping": {
+            "nik": "nik",
+            "expert": "expert",
+            "name": "expert",
+            "nama": "expert",
+            "event": "event",
+            "course_name": "event",
+            "course name": "event",
+            "course": "event",
+            "variasi": "variasi",
+            "variation": "variasi",
+            "sub_penugasan": "sub_penugasan",
+            "penugasan": "sub_penugasan",
+            "quarter": "quarter",
+        },
+        "dtypes": {
+            "expert": ARROW_STRING,
+            "event": ARROW_STRING,
+            "variasi": ARROW_STRING,
+            "sub_penugasan": ARROW_STRING,
+            "quarter": ARROW_STRING,
+        },
+        "columns": ["nik", "expert", "event", "variasi", "sub_penugasan", "quarter"],
+        "row_key": ["nik", "expert", "event", "variasi", "sub_penugasan", "quarter"],
+        "dedupe_filters": ["quarter"],
+        "fallback": {"quarter": "Quarter"},
+    },
+}
+
+
+def apply_fallback(df, destination):
+    """Isi kolom yang kosong / tidak ada dari metadata nama file (mis. quarter dari ..._Q1.xlsx)."""
+    for col, source in destination["fallback"].items():
+        if source not in df.columns:
+            continue
+        if col not in df.columns:
+            df[col] = df[source]
+        else:
+            blank = df[col].astype("string").str.strip().fillna("") == ""
+            df[col] = df[col].astype(object).mask(blank, df[source])
+    return df
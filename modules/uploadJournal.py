@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from modules.bulkInsert import iter_chunks
+
+# Satu file JSON per upload: chunk mana yang sudah ter-commit ke database
+JOURNAL_DIR = Path(__file__).resolve().parent.parent / ".cache" / "uploads"
+
+# id dibuat oleh database, jadi tidak ikut menentukan isi chunk
+HASH_EXCLUDE = ("id",)
+
+
+def chunk_hash(rows):
+    """Hash isi chunk (tanpa kolom id), stabil terhadap urutan kolom."""
+    payload = [{k: v for k, v in row.items() if k not in HASH_EXCLUDE} for row in rows]
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def frame_hash(df):
+    """Hash isi DataFrame (potongan file mentah), untuk jurnal upload streaming."""
+    values = pd.util.hash_pandas_object(df.astype("string"), index=False).to_numpy()
+    return hashlib.sha1(values.tobytes()).hexdigest()
+
+
+class UploadJournal:
+    """
+    Jurnal upload: batas dan hash setiap chunk yang sudah ter-commit.
+    Upload yang sama (tabel, ukuran chunk, dan isi identik) memakai jurnal
+    yang sama, sehingga upload yang terputus bisa dilanjutkan tanpa menduplikasi
+    chunk yang sudah masuk. Chunk yang terkirim tetapi belum sempat dicatat
+    (proses mati tepat setelah request) tetap akan dikirim ulang.
+    Baris yang ditolak server karena datanya dicatat terpisah per chunk; upload
+    yang masih punya baris ditolak tidak pernah ditandai selesai.
+    """
+
+    def __init__(self, table_name, upload_key, chunk_size, total_rows=None, hashes=None):
+        self.table_name = table_name
+        self.chunk_size = chunk_size
+        self.hashes = hashes or {}
+        self.path = JOURNAL_DIR / f"{table_name}__{upload_key}.json"
+        self._lock = threading.Lock()
+        self.state = self._load() or {
+            "table": table_name,
+            "chunk_size": chunk_size,
+            "total_rows": total_rows,
+            "created_at": time.time(),
+            "completed": False,
+            "chunks": {},
+            "failed": {},
+        }
+
+    @classmethod
+    def for_rows(cls, table_name, rows, chunk_size):
+        """Jurnal untuk daftar baris yang sudah lengkap di memori (dibagi per chunk_size)."""
+        hashes = {start: chunk_hash(chunk) for start, chunk in iter_chunks(rows, chunk_size)}
+        upload_key = hashlib.sha1(
+            f"{table_name}|{chunk_size}|{''.join(hashes.values())}".encode("utf-8")
+        ).hexdigest()[:20]
+        return cls(table_name, upload_key, chunk_size, total_rows=len(rows), hashes=hashes)
+
+    @classmethod
+    def for_file(cls, table_name, file_digest, chunk_size):
+        """Jurnal upload streaming satu file; hash tiap potongan diberikan saat dicek/dicatat."""
+        upload_key = hashlib.sha1(f"{table_name}|{chunk_size}|{file_digest}".encode("utf-8")).hexdigest()[:20]
+        return cls(table_name, upload_key, chunk_size)
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self):
+        JOURNAL_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.path)
+
+    @property
+    def completed(self):
+        return self.state["completed"] and not self.failed_rows
+
+    def is_committed(self, start, digest=None):
+        entry = self.state["chunks"].get(str(start))
+        digest = digest or self.hashes.get(start)
+        return entry is not None and entry["hash"] == digest
+
+    def _entries(self):
+        """Entri chunk yang cocok dengan isi upload ini (jurnal file: semua entri)."""
+        for start, entry in self.state["chunks"].items():
+            if not self.hashes or self.hashes.get(int(start)) == entry["hash"]:
+                yield int(start), entry
+
+    @property
+    def committed_rows(self):
+        return sum(entry["end"] - start for start, entry in self._entries())
+
+    @property
+    def committed_chunks(self):
+        return sum(1 for _ in self._entries())
+
+    @property
+    def failed_rows(self):
+        """(indeks_baris, pesan) yang ditolak server di chunk yang sudah ter-commit."""
+        failed = self.state.get("failed", {})
+        return [(start + i, message) for start, _ in self._entries() for i, message in failed.get(str(start), [])]
+
+    def pending(self, rows):
+        """(indeks_awal, potongan) yang belum ter-commit, berurutan."""
+        for start, chunk in iter_chunks(rows, self.chunk_size):
+            if not self.is_committed(start):
+                yield start, chunk
+
+    def mark_committed(self, start, size, digest=None, rejected=0, failed=None):
+        """
+        Catat chunk yang sudah diproses server: baris lain sudah masuk, `failed`
+        berisi (indeks_dalam_chunk, pesan) baris yang ditolak karena datanya.
+        """
+        with self._lock:
+            self.state["chunks"][str(start)] = {
+                "end": start + size,
+                "hash": digest or self.hashes[start],
+                "rejected": rejected,
+                "committed_at": time.time(),
+            }
+            failed_by_chunk = self.state.setdefault("failed", {})
+            if failed:
+                failed_by_chunk[str(start)] = [list(item) for item in failed]
+            else:
+                failed_by_chunk.pop(str(start), None)
+            self._save()
+
+    def finish(self):
+        """Tandai upload selesai; ditolak (False) jika masih ada baris yang gagal masuk."""
+        with self._lock:
+            if self.failed_rows:
+                return False
+            self.state["completed"] = True
+            self._save()
+            return True
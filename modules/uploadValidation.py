@@ -0,0 +1,119 @@
+import pandas as pd
+
+from modules.dtypePlan import downcast_numeric
+
+QUARTERS = ["Q1", "Q2", "Q3", "Q4"]
+
+# Skala jawaban numerik LIM1 (rata-rata × 10 = nilai 0–100 di halaman LIM1)
+ANSWER_RANGE = (1, 10)
+
+# Aturan validasi per tabel tujuan:
+#   required → kolom wajib ada dan tidak boleh kosong
+#   optional → boleh kosong, diisi `fill` (LIM1 memakai "empty" seperti data yang sudah ada)
+#   choices  → nilai yang diizinkan (dinormalisasi huruf besar)
+#   numeric  → wajib angka, dikonversi ke numerik (bilangan bulat di-downcast)
+#   ranges   → batas nilai (None = tanpa batas); untuk kolom non-numeric hanya
+#              jawaban berbentuk angka yang dicek dan ditulis ulang dalam bentuk
+#              angka baku ("5,5" → "5.5"). Teks lain tetap diterima: Answer LIM1
+#              juga berisi jawaban pertanyaan terbuka (saran/komentar peserta)
+SCHEMAS = {
+    "learningImpact1": {
+        "required": ["Event", "Question", "Answer", "Expert", "Quarter"],
+        "optional": ["Email", "Unit"],
+        "fill": "empty",
+        "choices": {"Quarter": QUARTERS},
+        "numeric": [],
+        "ranges": {"Answer": ANSWER_RANGE},
+    },
+    "learningHour_new": {
+        "required": ["nik", "expert", "event", "learningHour", "quarter"],
+        "optional": ["variasi", "profLevel", "company"],
+        "fill": None,
+        "choices": {"quarter": QUARTERS},
+        "numeric": ["nik", "learningHour", "profLevel"],
+        "ranges": {"learningHour": (0, None)},
+    },
+    "variation": {
+        "required": ["nik", "expert", "event", "variasi", "quarter"],
+        "optional": ["sub_penugasan"],
+        "fill": None,
+        "choices": {"quarter": QUARTERS},
+        "numeric": ["nik"],
+        "ranges": {},
+    },
+}
+
+
+def _as_text(series):
+    """Teks ter-strip; nilai kosong / NA menjadi NA."""
+    text = series.astype("string").str.strip()
+    return text.mask(text == "")
+
+
+def _as_number(series):
+    """Angka dari teks (koma desimal diterima); selain angka menjadi NaN."""
+    text = series.astype("string").str.replace(",", ".", regex=False).str.replace(r"\s+", "", regex=True)
+    return pd.to_numeric(text, errors="coerce").astype("float64")
+
+
+def validate(df, table_name):
+    """
+    Validasi dan koersi seluruh batch sekaligus (vektor, satu kali jalan).
+    Mengembalikan (baris_bersih, baris_ditolak). baris_ditolak berisi kolom
+    asli ditambah kolom "alasan".
+    """
+    schema = SCHEMAS[table_name]
+    df = df.reset_index(drop=True)
+    reasons = pd.Series("", index=df.index, dtype="object")
+
+    def reject(mask, message):
+        reasons.loc[mask] += message + "; "
+
+    out = pd.DataFrame(index=df.index)
+    for col in schema["required"]:
+        if col not in df.columns:
+            reject(slice(None), f"kolom {col} tidak ada")
+            continue
+        text = _as_text(df[col])
+        reject(text.isna(), f"{col} kosong")
+        if col in schema["numeric"]:
+            out[col] = _as_number(df[col])
+            reject(text.notna() & out[col].isna(), f"{col} bukan angka")
+        else:
+            out[col] = text
+
+    fill = schema["fill"]
+    for col in schema["optional"]:
+        if col in schema["numeric"]:
+            out[col] = _as_number(df[col]) if col in df.columns else float("nan")
+        elif col in df.columns:
+            out[col] = _as_text(df[col]) if fill is None else _as_text(df[col]).fillna(fill)
+        else:
+            out[col] = fill
+
+    for col, allowed in schema["choices"].items():
+        if col in out.columns:
+            out[col] = out[col].str.upper()
+            reject(out[col].notna() & ~out[col].isin(allowed), f"{col} harus salah satu dari {', '.join(allowed)}")
+
+    for col, (lo, hi) in schema["ranges"].items():
+        if col in out.columns:
+            number = out[col] if col in schema["numeric"] else _as_number(out[col])
+            if col not in schema["numeric"]:
+                out[col] = out[col].mask(number.notna(), number.map(lambda v: f"{v:g}", na_action="ignore"))
+            outside = pd.Series(False, index=df.index)
+            if lo is not None:
+                outside |= number < lo
+            if hi is not None:
+                outside |= number > hi
+            label = f"{lo}–{hi}" if lo is not None and hi is not None else (f"≥ {lo}" if lo is not None else f"≤ {hi}")
+            reject(number.notna() & outside, f"{col} di luar rentang {label}")
+
+    bad = reasons != ""
+    rejected = df[bad].copy()
+    rejected["alasan"] = reasons[bad].str.rstrip("; ")
+    clean = out[~bad].reset_index(drop=True)
+    for col in schema["numeric"]:
+        if col in clean.columns:
+            clean[col] = downcast_numeric(clean[col])
+    return clean, rejected.reset_index(drop=True)
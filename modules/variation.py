@@ -7,7 +7,6 @@ import pandas as pd
 import streamlit as st
 
 from dataManager import load_all_data
-from google import genai
 
 # bobot berdasarkan kata kunci (case-insensitive) - fallback jika tidak ada nilai eksplisit
 BOBOT_MAP = {
@@ -186,7 +185,7 @@ def variation_page():
     # load main data
     try:
         if source == "From Data Base":
-            df_main = load_all_data("learningImpact1")
+            df_main = load_all_data("learningImpact1", incremental=True)
         else:
             if uploaded is None:
                 st.info("Silakan unggah file atau pilih 'From Data Base'.")
@@ -371,7 +370,6 @@ import pandas as pd
 import streamlit as st
 
 from dataManager import load_all_data
-from google import genai
 
 # bobot berdasarkan kata kunci (case-insensitive) - fallback jika tidak ada nilai eksplisit
 BOBOT_MAP = {
@@ -550,7 +548,7 @@ def variation_page():
     # load main data
     try:
         if source == "From Data Base":
-            df_main = load_all_data("learningImpact1")
+            df_main = load_all_data("learningImpact1", incremental=True)
         else:
             if uploaded is None:
                 st.info("Silakan unggah file atau pilih 'From Data Base'.")
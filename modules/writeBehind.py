@@ -0,0 +1,229 @@
+import itertools
+import threading
+import time
+from collections import deque
+
+import streamlit as st
+
+from modules.bulkInsert import describe_error
+from modules.tableCache import invalidate_table
+
+PENDING = "pending"
+RUNNING = "running"
+COMMITTED = "committed"
+FAILED = "failed"
+
+# Jumlah job selesai yang tetap disimpan untuk ditampilkan statusnya
+MAX_FINISHED_JOBS = 200
+
+# Jumlah handle job terakhir yang diingat per sesi
+MAX_SESSION_JOBS = 50
+
+# Interval refresh panel status selama masih ada job yang berjalan (detik)
+STATUS_REFRESH_SECONDS = 2
+
+
+class WriteJob:
+    """Handle satu penulisan di antrean: status, hasil, dan error-nya."""
+
+    def __init__(self, job_id, table, key, label, fn):
+        self.id = job_id
+        self.table = table
+        self.key = key
+        self.label = label
+        self.fn = fn
+        self.status = PENDING
+        self.result = None
+        self.error = None
+        self.coalesced = 0
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self._done = threading.Event()
+
+    @property
+    def done(self):
+        return self.status in (COMMITTED, FAILED)
+
+    def wait(self, timeout=None):
+        """Tunggu sampai job selesai; mengembalikan True jika sudah selesai."""
+        return self._done.wait(timeout)
+
+
+class WriteBehindQueue:
+    """
+    Antrean tulis per proses: `submit` langsung mengembalikan WriteJob, lalu satu
+    thread latar menjalankan penulisan berurutan sesuai waktu submit.
+    Penulisan ke (tabel, kunci) yang sama selama job masih menunggu digabung:
+    hanya fungsi terakhir yang dijalankan dan handle lama tetap berlaku.
+    Cache tabel di-invalidate setelah penulisan ter-commit.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._queue = deque()
+        self._pending = {}
+        self._jobs = {}
+        self._finished = deque()
+        self._ids = itertools.count(1)
+        self._worker = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._worker.start()
+
+    def submit(self, table, key, fn, label=None):
+        """
+        Masukkan penulisan `fn()` untuk (table, key) ke antrean.
+        `fn` berjalan di thread latar, jadi tidak boleh memakai elemen Streamlit.
+        """
+        with self._lock:
+            job = self._pending.get((table, key))
+            if job is not None:
+                job.fn = fn
+                job.label = label or job.label
+                job.coalesced += 1
+                return job
+            job = WriteJob(next(self._ids), table, key, label or f"{table} {key}", fn)
+            self._pending[(table, key)] = job
+            self._jobs[job.id] = job
+            self._queue.append(job)
+            self._wakeup.notify()
+            return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._queue:
+                    self._wakeup.wait()
+                job = self._queue.popleft()
+                # Setelah mulai berjalan, penulisan baru ke kunci yang sama menjadi job baru
+                del self._pending[(job.table, job.key)]
+                job.status = RUNNING
+                fn = job.fn
+            try:
+                job.result = fn()
+                invalidate_table(job.table)
+                job.status = COMMITTED
+            except Exception as e:
+                job.error = describe_error(e)
+                job.status = FAILED
+            job.finished_at = time.time()
+            job._done.set()
+            self._forget_old(job)
+
+    def _forget_old(self, job):
+        with self._lock:
+            self._finished.append(job.id)
+            while len(self._finished) > MAX_FINISHED_JOBS:
+                self._jobs.pop(self._finished.popleft(), None)
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_write_queue():
+    """Antrean tulis bersama untuk seluruh sesi di proses ini (dibuat saat pertama dipakai)."""
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = WriteBehindQueue()
+        return _queue
+
+
+def submit_write(table, key, fn, label=None, on_commit=None):
+    """
+    Antrekan penulisan dan catat handle-nya di sesi ini agar statusnya tampil
+    di sidebar (show_write_status). Mengembalikan WriteJob.
+    `on_commit()` (opsional) dijalankan di thread script pada rerun setelah job
+    ter-commit, mis. untuk memperbarui DataFrame di sesi; tidak dijalankan jika gagal.
+    """
+    job = get_write_queue().submit(table, key, fn, label)
+    jobs = st.session_state.setdefault("_write_jobs", [])
+    if job.id not in jobs:
+        jobs.append(job.id)
+        del jobs[:-MAX_SESSION_JOBS]
+    # Job yang digabung memakai callback dari penulisan terakhir, sama seperti fn-nya
+    callbacks = st.session_state.setdefault("_write_callbacks", {})
+    if on_commit is not None:
+        callbacks[job.id] = on_commit
+    else:
+        callbacks.pop(job.id, None)
+    return job
+
+
+def _status_line(job):
+    if job.status == COMMITTED:
+        result = job.result
+        if isinstance(result, dict):
+            result = ", ".join(f"{k} {v}" for k, v in result.items())
+        detail = f" ({result})" if result else ""
+        return f"✅ {job.label}: tersimpan{detail}"
+    if job.status == FAILED:
+        return f"❌ {job.label}: gagal — {job.error}"
+    merged = f", {job.coalesced} perubahan digabung" if job.coalesced else ""
+    icon = "⏳" if job.status == PENDING else "🔄"
+    return f"{icon} {job.label}: {'menunggu' if job.status == PENDING else 'menyimpan'}{merged}"
+
+
+def _write_status_panel(jobs):
+    pending = sum(1 for job in jobs if not job.done)
+    failed = sum(1 for job in jobs if job.status == FAILED)
+    with st.expander(f"💾 Penyimpanan: {pending} berjalan, {failed} gagal", expanded=bool(pending or failed)):
+        for job in reversed(jobs[-10:]):
+            st.caption(_status_line(job))
+
+
+def _session_jobs():
+    queue = get_write_queue()
+    jobs = [queue.get(job_id) for job_id in st.session_state.get("_write_jobs", [])]
+    return [job for job in jobs if job is not None]
+
+
+def apply_committed_writes():
+    """
+    Jalankan on_commit milik job yang sudah ter-commit; callback job gagal/terlupa
+    dibuang. Dipanggil di awal tiap halaman (setelah mark_rerun_start) agar isi
+    halaman sudah memakai data hasil penulisan pada rerun yang sama.
+    """
+    callbacks = st.session_state.get("_write_callbacks")
+    if not callbacks:
+        return
+    by_id = {job.id: job for job in _session_jobs()}
+    for job_id in list(callbacks):
+        job = by_id.get(job_id)
+        if job is None or job.done:
+            callback = callbacks.pop(job_id)
+            if job is not None and job.status == COMMITTED:
+                callback()
+
+
+@st.fragment(run_every=STATUS_REFRESH_SECONDS)
+def _live_write_status():
+    jobs = _session_jobs()
+    if all(job.done for job in jobs):
+        # Rerun penuh: callback commit dijalankan di awal halaman dan panel diganti
+        # versi statis, jadi fragment ini tidak lagi di-refresh saat antrean sudah kosong
+        st.rerun(scope="app")
+    _write_status_panel(jobs)
+
+
+def show_write_status():
+    """
+    Panel status penyimpanan latar sesi ini di sidebar. Selama masih ada job
+    yang berjalan, panel diperbarui sendiri tanpa rerun seluruh halaman;
+    setelah semuanya selesai halaman di-rerun sekali dan refresh berhenti.
+    """
+    jobs = _session_jobs()
+    if not jobs:
+        return
+    # Job yang selesai setelah apply_committed_writes di awal halaman: callback-nya
+    # masih menunggu, jadi panel live dipakai agar rerun berikutnya menjalankannya
+    waiting = set(st.session_state.get("_write_callbacks", {}))
+    with st.sidebar:
+        if any(not job.done or job.id in waiting for job in jobs):
+            _live_write_status()
+        else:
+            _write_status_panel(jobs)
@@ -1,5 +1,15 @@
 import streamlit as st
-from modules.compensation import compensation_page
+from modules.importReport import import_report, show_import_report
+
+with import_report("Compensation"):
+    from modules.compensation import compensation_page
+    from modules.connectionStats import mark_rerun_start, show_connection_stats
+    from modules.writeBehind import apply_committed_writes, show_write_status
 
 st.set_page_config(page_title="Compensation", layout="wide")
+mark_rerun_start()
+apply_committed_writes()
 compensation_page()
+show_import_report("Compensation")
+show_write_status()
+show_connection_stats()
@@ -1,5 +1,15 @@
 import streamlit as st
-from modules.satisfactionRate import satisfaction_page
+from modules.importReport import import_report, show_import_report
+
+with import_report("Learning Impact 1"):
+    from modules.satisfactionRate import satisfaction_page
+    from modules.connectionStats import mark_rerun_start, show_connection_stats
+    from modules.writeBehind import apply_committed_writes, show_write_status
 
 st.set_page_config(page_title="Learning Impact 1", layout="wide")
+mark_rerun_start()
+apply_committed_writes()
 satisfaction_page()
+show_import_report("Learning Impact 1")
+show_write_status()
+show_connection_stats()
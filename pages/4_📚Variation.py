@@ -1,6 +1,16 @@
 import streamlit as st
-from modules.variation import variation_page
-from modules.newVariation import newVariationPage
+from modules.importReport import import_report, show_import_report
+
+with import_report("Variation"):
+    from modules.variation import variation_page
+    from modules.newVariation import newVariationPage
+    from modules.connectionStats import mark_rerun_start, show_connection_stats
+    from modules.writeBehind import apply_committed_writes, show_write_status
 
 st.set_page_config(page_title="Variation", layout="wide")
+mark_rerun_start()
+apply_committed_writes()
 newVariationPage()
+show_import_report("Variation")
+show_write_status()
+show_connection_stats()
@@ -1,5 +1,15 @@
 import streamlit as st
-from dataManager import show_data_manager
+from modules.importReport import import_report, show_import_report
+
+with import_report("Data Manager"):
+    from dataManager import show_data_manager
+    from modules.connectionStats import mark_rerun_start, show_connection_stats
+    from modules.writeBehind import apply_committed_writes, show_write_status
 
 st.set_page_config(page_title="Data Manager", layout="wide")
+mark_rerun_start()
+apply_committed_writes()
 show_data_manager()
+show_import_report("Data Manager")
+show_write_status()
+show_connection_stats()
@@ -0,0 +1,41 @@
+-- Pelacakan perubahan untuk sinkronisasi delta (modules/tableSync.py).
+-- Jalankan sekali di SQL editor Supabase.
+
+-- 1. Kolom updated_at yang selalu diperbarui saat baris berubah
+create or replace function set_updated_at() returns trigger as $$
+begin
+    new.updated_at := now();
+    return new;
+end;
+$$ language plpgsql;
+
+-- 2. Tombstone untuk baris yang dihapus
+create table if not exists deleted_rows (
+    id bigint generated always as identity primary key,
+    table_name text not null,
+    row_id bigint not null,
+    deleted_at timestamptz not null default now()
+);
+create index if not exists deleted_rows_table_deleted_at_idx on deleted_rows (table_name, deleted_at);
+
+create or replace function record_deleted_row() returns trigger as $$
+begin
+    insert into deleted_rows (table_name, row_id) values (tg_table_name, old.id);
+    return old;
+end;
+$$ language plpgsql;
+
+-- 3. Pasang pada tabel yang disinkronkan
+do $$
+declare
+    t text;
+begin
+    foreach t in array array['learningImpact1', 'learningHour_new'] loop
+        execute format('alter table %I add column if not exists updated_at timestamptz not null default now()', t);
+        execute format('create index if not exists %I on %I (updated_at)', t || '_updated_at_idx', t);
+        execute format('drop trigger if exists set_updated_at on %I', t);
+        execute format('create trigger set_updated_at before update on %I for each row execute function set_updated_at()', t);
+        execute format('drop trigger if exists record_deleted_row on %I', t);
+        execute format('create trigger record_deleted_row after delete on %I for each row execute function record_deleted_row()', t);
+    end loop;
+end $$;
@@ -0,0 +1,27 @@
+-- id dibuat oleh server (identity) agar beberapa uploader bisa insert bersamaan
+-- tanpa bentrok primary key. Aplikasi tidak lagi mengirim kolom id saat upload.
+-- Jalankan sekali di SQL editor Supabase (aman dijalankan ulang).
+
+do $$
+declare
+    t text;
+    seq text;
+begin
+    foreach t in array array['learningImpact1', 'learningHour_new'] loop
+        -- 1. Pastikan id punya generator di server
+        if not exists (
+            select 1 from information_schema.columns
+            where table_schema = 'public' and table_name = t and column_name = 'id'
+              and (is_identity = 'YES' or column_default like 'nextval(%')
+        ) then
+            execute format('alter table %I alter column id add generated by default as identity', t);
+        end if;
+
+        -- 2. Majukan generator melewati id yang selama ini dibuat di klien (last_id + 1)
+        seq := pg_get_serial_sequence(format('%I', t), 'id');
+        execute format(
+            'select setval(%L, coalesce((select max(id) from %I), 0) + 1, false)',
+            seq, t
+        );
+    end loop;
+end $$;
@@ -0,0 +1,22 @@
+-- Tabel tujuan upload "Variation" di Data Manager (modules/uploadDestinations.py).
+-- Jalankan setelah 001 (memakai fungsi set_updated_at / record_deleted_row).
+
+create table if not exists variation (
+    id bigint generated by default as identity primary key,
+    nik bigint not null,
+    expert text not null,
+    event text not null,
+    variasi text not null,
+    sub_penugasan text,
+    quarter text not null check (quarter in ('Q1', 'Q2', 'Q3', 'Q4')),
+    updated_at timestamptz not null default now()
+);
+create index if not exists variation_quarter_event_idx on variation (quarter, event);
+create index if not exists variation_updated_at_idx on variation (updated_at);
+
+drop trigger if exists set_updated_at on variation;
+create trigger set_updated_at before update on variation
+    for each row execute function set_updated_at();
+drop trigger if exists record_deleted_row on variation;
+create trigger record_deleted_row after delete on variation
+    for each row execute function record_deleted_row();
@@ -0,0 +1,39 @@
+-- Satu baris per expert per quarter di tabel calculated, agar skor bisa
+-- di-upsert dengan on_conflict=nik,quarter (modules/calculatedWriter.py).
+-- Baris ganda yang sudah ada digabung dulu: baris terbaru (id terbesar) dipertahankan
+-- dan kolom skornya yang kosong diisi dari nilai terbaru baris ganda lainnya.
+
+with grouped as (
+    select
+        nik,
+        quarter,
+        max(id) as keep_id,
+        (array_agg("LH" order by id desc) filter (where "LH" is not null))[1] as lh,
+        (array_agg(learning_hour order by id desc) filter (where learning_hour is not null))[1] as learning_hour,
+        (array_agg(variation order by id desc) filter (where variation is not null))[1] as variation,
+        (array_agg(expert_level order by id desc) filter (where expert_level is not null))[1] as expert_level
+    from calculated
+    where nik is not null
+    group by nik, quarter
+    having count(*) > 1
+)
+update calculated c set
+    "LH" = coalesce(c."LH", g.lh),
+    learning_hour = coalesce(c.learning_hour, g.learning_hour),
+    variation = coalesce(c.variation, g.variation),
+    expert_level = coalesce(c.expert_level, g.expert_level)
+from grouped g
+where c.id = g.keep_id;
+
+delete from calculated c
+using calculated newer
+where c.nik = newer.nik
+  and c.quarter = newer.quarter
+  and c.id < newer.id;
+
+do $$
+begin
+    if not exists (select 1 from pg_constraint where conname = 'calculated_nik_quarter_key') then
+        alter table calculated add constraint calculated_nik_quarter_key unique (nik, quarter);
+    end if;
+end $$;
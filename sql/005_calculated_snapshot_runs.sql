@@ -0,0 +1,74 @@
+-- Snapshot skor Learning Hour per quarter (modules/calculatedWriter.replace_learning_hour_run).
+-- Setiap "Simpan ke Database" adalah satu run (run_id). Run baru menggantikan run
+-- sebelumnya untuk quarter itu dalam satu transaksi, jadi tabel calculated hanya
+-- berisi versi terkini dan pembaca (mis. halaman Compensation) tidak perlu memfilter run.
+-- Jalankan setelah 004 (butuh constraint unik nik, quarter).
+
+create table if not exists calculated_runs (
+    run_id uuid primary key,
+    quarter text not null,
+    source text not null,
+    row_count integer not null,
+    inserted integer not null,
+    updated integer not null,
+    cleared integer not null,
+    created_at timestamptz not null default now()
+);
+create index if not exists calculated_runs_quarter_source_idx on calculated_runs (quarter, source, created_at desc);
+
+-- Run terakhir yang menulis kolom Learning Hour pada baris ini
+alter table calculated add column if not exists lh_run_id uuid;
+
+create or replace function replace_learning_hour_snapshot(p_quarter text, p_run_id uuid, p_rows jsonb)
+returns jsonb as $$
+declare
+    v_inserted integer;
+    v_updated integer;
+    v_cleared integer;
+begin
+    -- Dua run untuk quarter yang sama tidak boleh berjalan bersamaan
+    perform pg_advisory_xact_lock(hashtext('calculated_learning_hour_' || p_quarter));
+
+    -- Run yang sama dikirim ulang (retry) → tidak ada yang ditulis dua kali
+    if exists (select 1 from calculated_runs where run_id = p_run_id) then
+        return (
+            select jsonb_build_object('inserted', inserted, 'updated', updated, 'cleared', cleared, 'replayed', true)
+            from calculated_runs where run_id = p_run_id
+        );
+    end if;
+
+    with src as (
+        select * from jsonb_to_recordset(p_rows) as r(nik bigint, expert text, learning_hour numeric, "LH" numeric)
+        where nik is not null
+    ), written as (
+        insert into calculated (nik, expert, quarter, learning_hour, "LH", lh_run_id)
+        select nik, expert, p_quarter, learning_hour, "LH", p_run_id from src
+        on conflict (nik, quarter) do update set
+            expert = excluded.expert,
+            learning_hour = excluded.learning_hour,
+            "LH" = excluded."LH",
+            lh_run_id = excluded.lh_run_id
+        returning (xmax = 0) as is_insert
+    )
+    select count(*) filter (where is_insert), count(*) filter (where not is_insert)
+    into v_inserted, v_updated
+    from written;
+
+    -- Expert yang tidak ada di run ini: nilai Learning Hour dari run lama dihapus
+    update calculated
+    set learning_hour = null, "LH" = null, lh_run_id = null
+    where quarter = p_quarter and lh_run_id is distinct from p_run_id
+      and (learning_hour is not null or "LH" is not null);
+    get diagnostics v_cleared = row_count;
+
+    -- Baris yang tidak lagi punya skor apa pun tidak perlu disimpan
+    delete from calculated
+    where quarter = p_quarter
+      and learning_hour is null and "LH" is null and variation is null and expert_level is null;
+
+    insert into calculated_runs (run_id, quarter, source, row_count, inserted, updated, cleared)
+    values (p_run_id, p_quarter, 'learning_hour', v_inserted + v_updated, v_inserted, v_updated, v_cleared);
+
+    return jsonb_build_object('inserted', v_inserted, 'updated', v_updated, 'cleared', v_cleared, 'replayed', false);
+end;
+$$ language plpgsql;
@@ -0,0 +1,55 @@
+-- Commit semua komponen skor satu quarter sekaligus (menu "Commit Quarter" di Data Manager,
+-- modules/calculatedWriter.commit_quarter_scores). Satu panggilan = satu transaksi:
+-- learning_hour, LH, variation, dan expert_level ditulis bersama, dan expert yang tidak
+-- ada di commit ini dihapus dari quarter tersebut, sehingga calculated tidak pernah
+-- terlihat setengah diperbarui. Jalankan setelah 005 (memakai calculated_runs / lh_run_id).
+
+create or replace function commit_quarter_scores(p_quarter text, p_run_id uuid, p_rows jsonb)
+returns jsonb as $$
+declare
+    v_inserted integer;
+    v_updated integer;
+    v_removed integer;
+begin
+    -- Kunci yang sama dengan replace_learning_hour_snapshot: penulisan quarter berurutan
+    perform pg_advisory_xact_lock(hashtext('calculated_learning_hour_' || p_quarter));
+
+    -- Run yang sama dikirim ulang (retry) → tidak ada yang ditulis dua kali
+    if exists (select 1 from calculated_runs where run_id = p_run_id) then
+        return (
+            select jsonb_build_object('inserted', inserted, 'updated', updated, 'removed', cleared, 'replayed', true)
+            from calculated_runs where run_id = p_run_id
+        );
+    end if;
+
+    with src as (
+        select * from jsonb_to_recordset(p_rows) as r(
+            nik bigint, expert text, learning_hour numeric, "LH" numeric, variation numeric, expert_level numeric
+        )
+        where nik is not null
+    ), written as (
+        insert into calculated (nik, expert, quarter, learning_hour, "LH", variation, expert_level, lh_run_id)
+        select nik, expert, p_quarter, learning_hour, "LH", variation, expert_level, p_run_id from src
+        on conflict (nik, quarter) do update set
+            expert = excluded.expert,
+            learning_hour = excluded.learning_hour,
+            "LH" = excluded."LH",
+            variation = excluded.variation,
+            expert_level = excluded.expert_level,
+            lh_run_id = excluded.lh_run_id
+        returning (xmax = 0) as is_insert
+    )
+    select count(*) filter (where is_insert), count(*) filter (where not is_insert)
+    into v_inserted, v_updated
+    from written;
+
+    -- Semua baris yang ditulis commit ini bertanda run_id-nya; sisanya berasal dari run lama
+    delete from calculated where quarter = p_quarter and lh_run_id is distinct from p_run_id;
+    get diagnostics v_removed = row_count;
+
+    insert into calculated_runs (run_id, quarter, source, row_count, inserted, updated, cleared)
+    values (p_run_id, p_quarter, 'quarter', v_inserted + v_updated, v_inserted, v_updated, v_removed);
+
+    return jsonb_build_object('inserted', v_inserted, 'updated', v_updated, 'removed', v_removed, 'replayed', false);
+end;
+$$ language plpgsql;
@@ -0,0 +1,11 @@
+from modules.asyncPostgrest import _filter_params
+
+
+def test_eq_values_are_sent_raw():
+    params = _filter_params({"quarter": "Q1 2025", "Email": "a.b@x.com"})
+    assert params == {"quarter": "eq.Q1 2025", "Email": "eq.a.b@x.com"}
+
+
+def test_in_values_are_quoted_when_needed():
+    params = _filter_params({"expert": ["Budi", "Siti, S.T.", 'A "B"']})
+    assert params["expert"] == 'in.(Budi,"Siti, S.T.","A \\"B\\"")'
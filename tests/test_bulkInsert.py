@@ -0,0 +1,45 @@
+import asyncio
+
+import httpx
+
+from modules.bulkInsert import insert_chunk, is_row_error, upload_chunks
+
+
+def _error(status, body):
+    request = httpx.Request("POST", "http://db/rest/v1/t")
+    response = httpx.Response(status, json=body, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+class FakeDb:
+    def __init__(self, error_for):
+        self.error_for = error_for
+        self.requests = 0
+
+    async def insert(self, table, rows):
+        self.requests += 1
+        error = self.error_for(rows)
+        if error is not None:
+            raise error
+
+
+def test_row_errors_are_recognised_by_postgres_code():
+    assert is_row_error(_error(400, {"code": "22P02"}))
+    assert is_row_error(_error(409, {"code": "23505"}))
+    assert not is_row_error(_error(400, {"code": "PGRST204"}))
+    assert not is_row_error(_error(404, {"code": "42P01"}))
+    assert not is_row_error(_error(401, {}))
+
+
+def test_bad_row_is_isolated_by_splitting():
+    db = FakeDb(lambda rows: _error(400, {"code": "22P02"}) if {"v": 3} in rows else None)
+    failed = asyncio.run(insert_chunk(db, "t", [{"v": i} for i in range(8)]))
+    assert [i for i, _ in failed] == [3]
+
+
+def test_missing_table_is_not_split_and_stops_upload():
+    db = FakeDb(lambda rows: _error(404, {"code": "42P01"}))
+    chunks = [(start, [{"v": i} for i in range(start, start + 100)]) for start in range(0, 2000, 100)]
+    result = asyncio.run(upload_chunks(db, "t", chunks, workers=2))
+    assert result["error"] is not None
+    assert db.requests <= 2
@@ -0,0 +1,23 @@
+import pandas as pd
+
+from modules import diskCache, tableCache
+from modules.dtypePlan import apply_dtype_plan
+
+
+def test_ttl_matches_memory_cache():
+    assert diskCache.DEFAULT_TTL == tableCache.DEFAULT_TTL
+
+
+def test_roundtrip_keeps_dtype_plan(tmp_path, monkeypatch):
+    monkeypatch.setattr(diskCache, "CACHE_DIR", tmp_path)
+    df, _, _ = apply_dtype_plan("learningImpact1", pd.DataFrame({
+        "Email": ["a@x.com", None],
+        "Answer": ["8", "9"],
+        "Quarter": ["Q1", "Q1"],
+        "Note": ["bebas", "teks"],
+    }))
+    assert diskCache.put("learningImpact1", ("q",), df)
+
+    restored, _ = diskCache.get("learningImpact1", ("q",))
+    assert restored.dtypes.to_dict() == df.dtypes.to_dict()
+    pd.testing.assert_frame_equal(restored, df)
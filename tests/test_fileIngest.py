@@ -0,0 +1,44 @@
+import io
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+from modules import fileIngest
+
+
+class Upload(io.BytesIO):
+    def __init__(self, name, content):
+        super().__init__(content)
+        self.name = name
+
+
+class BrokenPool:
+    """Pool yang worker-nya mati: file pertama selesai, sisanya BrokenProcessPool."""
+
+    def __init__(self):
+        self.calls = 0
+        self.shut_down = False
+
+    def submit(self, fn, *args):
+        future = Future()
+        if self.calls == 0:
+            future.set_result(fn(*args))
+        else:
+            future.set_exception(BrokenProcessPool("worker mati"))
+        self.calls += 1
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+def test_broken_pool_reports_each_file_and_is_reset(monkeypatch):
+    pool = BrokenPool()
+    monkeypatch.setattr(fileIngest, "_pool", pool)
+    files = [Upload(f"event{i}_Budi_HC_Q1.csv", b"Email,Answer\na@x.com,8\n") for i in range(3)]
+
+    frames, errors = fileIngest.read_files(files)
+
+    assert len(frames) == 1
+    assert [name for name, _ in errors] == ["event1_Budi_HC_Q1.csv", "event2_Budi_HC_Q1.csv"]
+    assert pool.shut_down
+    assert fileIngest._pool is None
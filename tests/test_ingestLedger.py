@@ -0,0 +1,37 @@
+import pandas as pd
+
+from modules.ingestLedger import ROW_KEY, drop_duplicate_rows
+
+
+def _answers(emails):
+    return pd.DataFrame({
+        "Email": emails,
+        "Event": "Sharing Session",
+        "Question": "Materi mudah dipahami",
+        "Answer": "9",
+        "Expert": "Budi",
+        "Quarter": "Q1",
+    })
+
+
+def test_anonymous_identical_answers_are_kept():
+    df = _answers(["empty", "empty", None, ""])
+    existing = _answers(["empty"])
+    kept, dup_batch, dup_db = drop_duplicate_rows(df, existing, ROW_KEY)
+    assert len(kept) == 4
+    assert (dup_batch, dup_db) == (0, 0)
+
+
+def test_identified_duplicates_are_dropped():
+    df = _answers(["a@x.id", "a@x.id", "b@x.id"])
+    existing = _answers(["b@x.id"])
+    kept, dup_batch, dup_db = drop_duplicate_rows(df, existing, ROW_KEY)
+    assert kept["Email"].tolist() == ["a@x.id"]
+    assert (dup_batch, dup_db) == (1, 1)
+
+
+def test_numeric_key_matches_across_int_and_float():
+    upload = pd.DataFrame({"nik": pd.array([101], dtype="Int32"), "learningHour": [2]})
+    existing = pd.DataFrame({"nik": [101], "learningHour": [2.0]})
+    kept, _, dup_db = drop_duplicate_rows(upload, existing, ["nik", "learningHour"])
+    assert kept.empty and dup_db == 1
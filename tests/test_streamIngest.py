@@ -0,0 +1,95 @@
+import io
+
+import pandas as pd
+
+from modules import streamIngest, uploadJournal
+from modules.streamIngest import StreamIngest
+from modules.uploadDestinations import DESTINATIONS
+
+DESTINATION = DESTINATIONS["Learning Impact 1"]
+
+
+def _csv(rows):
+    return io.BytesIO(pd.DataFrame(rows).to_csv(index=False).encode("utf-8"))
+
+
+def _answer(email, answer="8"):
+    return {"Email": email, "Question": "Q1", "Answer": answer}
+
+
+def _run(files, monkeypatch, tmp_path):
+    monkeypatch.setattr(uploadJournal, "JOURNAL_DIR", tmp_path)
+    stream = StreamIngest(files, DESTINATION, 2, lambda filters: pd.DataFrame(columns=DESTINATION["row_key"]))
+    sent = []
+    for offset, rows in stream.chunks():
+        sent.extend(rows)
+        stream.on_chunk_done(offset, rows, [])
+    return stream, sent
+
+
+def test_bad_file_is_reported_and_next_file_continues(monkeypatch, tmp_path):
+    files = [
+        ("rusak_Budi_HC_Q1.parquet", io.BytesIO(b"bukan parquet"), "a" * 64),
+        ("event_Budi_HC_Q1.csv", _csv([_answer("a@x.com"), _answer("b@x.com")]), "b" * 64),
+    ]
+    stream, sent = _run(files, monkeypatch, tmp_path)
+
+    assert [name for name, _ in stream.file_errors] == ["rusak_Budi_HC_Q1.parquet"]
+    assert stream.stats["files_failed"] == 1
+    assert len(sent) == 2
+    assert stream.finish() == [("event_Budi_HC_Q1.csv", "b" * 64)]
+
+
+def test_seen_hashes_stay_bounded(monkeypatch, tmp_path):
+    monkeypatch.setattr(streamIngest, "MAX_SEEN_HASHES", 4)
+    rows = [_answer(f"user{i}@x.com") for i in range(10)] + [_answer("user9@x.com")]
+    stream, sent = _run([("event_Budi_HC_Q1.csv", _csv(rows), "c" * 64)], monkeypatch, tmp_path)
+
+    assert stream._seen_count <= 4
+    assert len(sent) == 10
+    assert stream.stats["dup_batch"] == 1
+
+
+def _http_error(status, code):
+    import httpx
+
+    request = httpx.Request("POST", "http://db/rest/v1/learningImpact1")
+    response = httpx.Response(status, json={"code": code}, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+def _run_failing(files, error, monkeypatch, tmp_path):
+    monkeypatch.setattr(uploadJournal, "JOURNAL_DIR", tmp_path)
+    stream = StreamIngest(files, DESTINATION, 2, lambda filters: pd.DataFrame(columns=DESTINATION["row_key"]))
+    sent = []
+    for offset, rows in stream.chunks():
+        sent.extend(rows)
+        stream.on_chunk_done(offset, rows, [(offset + i, error) for i in range(len(rows))])
+    return stream, sent
+
+
+def test_chunks_rejected_for_non_row_reasons_are_resent(monkeypatch, tmp_path):
+    rows = [_answer("a@x.com"), _answer("b@x.com"), _answer("c@x.com")]
+    file = lambda: [("event_Budi_HC_Q1.csv", _csv(rows), "d" * 64)]
+
+    stream, sent = _run_failing(file(), _http_error(404, "42P01"), monkeypatch, tmp_path)
+    assert len(sent) == 3
+    assert stream.finish() == []
+
+    stream, sent = _run(file(), monkeypatch, tmp_path)
+    assert len(sent) == 3
+    assert stream.finish() == [("event_Budi_HC_Q1.csv", "d" * 64)]
+
+
+def test_rows_rejected_by_the_server_keep_the_file_incomplete(monkeypatch, tmp_path):
+    rows = [_answer("a@x.com"), _answer("b@x.com")]
+    file = lambda: [("event_Budi_HC_Q1.csv", _csv(rows), "e" * 64)]
+
+    stream, _ = _run_failing(file(), _http_error(400, "22P02"), monkeypatch, tmp_path)
+    assert stream.finish() == []
+
+    # Upload ulang: potongannya sudah diproses (tidak dikirim lagi), tapi tetap belum selesai
+    stream, sent = _run(file(), monkeypatch, tmp_path)
+    assert sent == []
+    assert stream.finish() == []
+    assert stream.stats["failed_before"] == 2
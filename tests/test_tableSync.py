@@ -0,0 +1,82 @@
+import pandas as pd
+
+from modules import tableSync
+
+
+class FakeQuery:
+    def __init__(self, rows, log):
+        self.rows = rows
+        self.log = log
+        self.limit_n = None
+        self.after_id = None
+
+    def select(self, *args):
+        return self
+
+    def or_(self, condition):
+        self.log.append(condition)
+        return self
+
+    def gt(self, column, value):
+        if column == "id":
+            self.after_id = value
+        return self
+
+    def eq(self, *args):
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        return self
+
+    def execute(self):
+        rows = [r for r in self.rows if self.after_id is None or r["id"] > self.after_id]
+        return type("Response", (), {"data": rows[:self.limit_n]})()
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.delta = []
+        self.conditions = []
+
+    def table(self, name):
+        if name == tableSync.TOMBSTONE_TABLE:
+            return FakeQuery([], [])
+        return FakeQuery(self.delta, self.conditions)
+
+
+def _row(i, updated_at):
+    return {"id": i, "Answer": "8", "updated_at": updated_at}
+
+
+def _sync(monkeypatch, supabase, table, loader):
+    monkeypatch.setattr(tableSync, "_persist", lambda *args: None)
+    return tableSync.sync_table(supabase, table, loader, batch_size=100)
+
+
+def test_delta_query_resumes_after_last_updated_row(monkeypatch):
+    supabase = FakeSupabase()
+    rows = [_row(1, "2026-01-01T00:00:00+00:00"), _row(2, "2026-01-01T00:00:05+00:00")]
+    _sync(monkeypatch, supabase, "ts_keyset", lambda: rows)
+
+    _, summary = _sync(monkeypatch, supabase, "ts_keyset", None)
+    assert summary["changed"] == 0
+    condition = supabase.conditions[-1]
+    assert 'updated_at.gt."2026-01-01T00:00:05+00:00"' in condition
+    assert 'and(updated_at.eq."2026-01-01T00:00:05+00:00",id.gt.2)' in condition
+    tableSync.drop_snapshot("ts_keyset")
+
+
+def test_delta_sync_after_empty_full_load(monkeypatch):
+    supabase = FakeSupabase()
+    _sync(monkeypatch, supabase, "ts_empty", lambda: [])
+
+    supabase.delta = [_row(1, "2026-01-01T00:00:00+00:00")]
+    df, summary = _sync(monkeypatch, supabase, "ts_empty", None)
+    assert df["id"].tolist() == [1]
+    assert summary["new"] == 1
+    assert tableSync.get_snapshot("ts_empty").change_tracking
+    tableSync.drop_snapshot("ts_empty")
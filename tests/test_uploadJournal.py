@@ -0,0 +1,29 @@
+from modules import uploadJournal
+from modules.uploadJournal import UploadJournal
+
+ROWS = [{"Email": f"user{i}@x.com", "Answer": "8"} for i in range(4)]
+
+
+def test_journal_with_failed_rows_never_completes(monkeypatch, tmp_path):
+    monkeypatch.setattr(uploadJournal, "JOURNAL_DIR", tmp_path)
+    journal = UploadJournal.for_rows("learningImpact1", ROWS, 2)
+    journal.mark_committed(0, 2)
+    journal.mark_committed(2, 2, failed=[(1, "400: bad")])
+
+    assert journal.failed_rows == [(3, "400: bad")]
+    assert not journal.finish()
+
+    reloaded = UploadJournal.for_rows("learningImpact1", ROWS, 2)
+    assert not reloaded.completed
+    assert list(reloaded.pending(ROWS)) == []
+    assert reloaded.failed_rows == [(3, "400: bad")]
+
+
+def test_journal_without_failures_completes(monkeypatch, tmp_path):
+    monkeypatch.setattr(uploadJournal, "JOURNAL_DIR", tmp_path)
+    journal = UploadJournal.for_rows("learningImpact1", ROWS, 2)
+    journal.mark_committed(0, 2)
+    journal.mark_committed(2, 2)
+
+    assert journal.finish()
+    assert UploadJournal.for_rows("learningImpact1", ROWS, 2).completed
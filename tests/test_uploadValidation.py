@@ -0,0 +1,26 @@
+import pandas as pd
+
+from modules.uploadValidation import validate
+
+
+def _lim1(answers):
+    return pd.DataFrame({
+        "Event": "Workshop",
+        "Question": "Q",
+        "Answer": answers,
+        "Expert": "Budi",
+        "Quarter": "q1",
+    })
+
+
+def test_numeric_answers_are_written_back_normalized():
+    clean, rejected = validate(_lim1(["5,5", " 8 ", "10.0"]), "learningImpact1")
+    assert rejected.empty
+    assert clean["Answer"].tolist() == ["5.5", "8", "10"]
+    assert pd.to_numeric(clean["Answer"]).tolist() == [5.5, 8, 10]
+
+
+def test_open_text_answers_are_kept_and_out_of_range_rejected():
+    clean, rejected = validate(_lim1(["bagus sekali", "11"]), "learningImpact1")
+    assert clean["Answer"].tolist() == ["bagus sekali"]
+    assert rejected["alasan"].tolist() == ["Answer di luar rentang 1–10"]